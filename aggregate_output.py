@@ -1,39 +1,57 @@
 import json
-from collections import Counter, defaultdict
-
-# Baca data hasil join
-with open('output_data.json') as f:
-    data = json.load(f)
-
-# 1. Frekuensi Permintaan Per Pengguna
-freq_per_user = Counter()
-for item in data:
-    user_id = item.get('user_id')
-    if user_id:
-        freq_per_user[user_id] += 1
-
-with open('freq_per_user.json', 'w') as f:
-    json.dump(freq_per_user, f, indent=2)
-
-# 2. Performa API (rata-rata response_time per endpoint)
-api_perf = defaultdict(list)
-for item in data:
-    endpoint = item.get('endpoint')
-    resp_time = item.get('response_time')
-    if endpoint and resp_time is not None:
-        api_perf[endpoint].append(resp_time)
-
-api_perf_avg = {ep: sum(times)/len(times) for ep, times in api_perf.items() if times}
-
-with open('api_performance.json', 'w') as f:
-    json.dump(api_perf_avg, f, indent=2)
-
-# 3. Frekuensi Penggunaan Endpoint
-freq_endpoint = Counter()
-for item in data:
-    endpoint = item.get('endpoint')
-    if endpoint:
-        freq_endpoint[endpoint] += 1
-
-with open('freq_endpoint.json', 'w') as f:
-    json.dump(freq_endpoint, f, indent=2) 
\ No newline at end of file
+import sys
+from typing import Any, Dict, Iterable, Tuple
+from src.extractors.json_stream import iter_json_records
+
+
+def aggregate(records: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, int], Dict[str, float], Dict[str, int]]:
+    """
+    Hitung ketiga agregat dalam satu pass atas record (bisa berupa generator)
+
+    Hanya state agregat yang disimpan (count per key dan sum/count per endpoint),
+    bukan record-nya, jadi memory tidak bergantung pada jumlah record.
+    Urutan key dan hasil rata-rata sama persis dengan versi yang membaca
+    seluruh file dengan json.load.
+
+    Returns:
+        (freq_per_user, api_performance, freq_endpoint)
+    """
+    # dict biasa + get(): lebih cepat dari Counter di loop per record, hasil JSON sama
+    freq_per_user = {}
+    freq_endpoint = {}
+    api_total = {}
+    api_count = {}
+    for item in records:
+        # 1. Frekuensi Permintaan Per Pengguna
+        user_id = item.get('user_id')
+        if user_id:
+            freq_per_user[user_id] = freq_per_user.get(user_id, 0) + 1
+
+        endpoint = item.get('endpoint')
+        if endpoint:
+            # 3. Frekuensi Penggunaan Endpoint
+            freq_endpoint[endpoint] = freq_endpoint.get(endpoint, 0) + 1
+
+            # 2. Performa API (rata-rata response_time per endpoint), dijumlahkan berurutan
+            # seperti sum() atas list sehingga hasilnya identik
+            resp_time = item.get('response_time')
+            if resp_time is not None:
+                api_total[endpoint] = api_total.get(endpoint, 0) + resp_time
+                api_count[endpoint] = api_count.get(endpoint, 0) + 1
+
+    api_perf_avg = {ep: total / api_count[ep] for ep, total in api_total.items()}
+    return freq_per_user, api_perf_avg, freq_endpoint
+
+
+def main(input_path: str = 'output_data.json'):
+    # Baca data hasil join secara streaming (JSON array atau NDJSON)
+    freq_per_user, api_perf_avg, freq_endpoint = aggregate(iter_json_records(input_path))
+
+    for fname, data in [('freq_per_user.json', freq_per_user), ('api_performance.json', api_perf_avg),
+                        ('freq_endpoint.json', freq_endpoint)]:
+        with open(fname, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'output_data.json')
@@ -0,0 +1,145 @@
+"""
+Benchmark aggregate_output.py: json.load + tiga loop vs streaming satu pass
+
+Input dibuat dengan mengulang record sampel (default output_data.json, atau
+api_logs.jsonl jika file itu bukan hasil join) sebanyak replication kali, sebagai
+JSON array indent 2 (format DataFrame.to_json di main.py) dan sebagai NDJSON.
+Setiap varian dijalankan di process terpisah supaya peak RSS-nya terukur.
+
+Usage:
+    python benchmarks/bench_aggregate_output.py [sample.json|sample.jsonl] [replication ...]
+"""
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregate_output import aggregate
+from src.extractors.json_stream import iter_json_records
+
+
+def legacy_aggregate(path: str):
+    """aggregate_output.py sebelum streaming: seluruh file di-json.load lalu dijalani tiga kali"""
+    with open(path) as f:
+        data = json.load(f)
+
+    freq_per_user = Counter()
+    for item in data:
+        user_id = item.get('user_id')
+        if user_id:
+            freq_per_user[user_id] += 1
+
+    api_perf = defaultdict(list)
+    for item in data:
+        endpoint = item.get('endpoint')
+        resp_time = item.get('response_time')
+        if endpoint and resp_time is not None:
+            api_perf[endpoint].append(resp_time)
+    api_perf_avg = {ep: sum(times) / len(times) for ep, times in api_perf.items() if times}
+
+    freq_endpoint = Counter()
+    for item in data:
+        endpoint = item.get('endpoint')
+        if endpoint:
+            freq_endpoint[endpoint] += 1
+    return freq_per_user, api_perf_avg, freq_endpoint
+
+
+def streaming_aggregate(path: str):
+    return aggregate(iter_json_records(path))
+
+
+def load_sample(source: str) -> list:
+    """Record sampel; jika file bukan hasil join (tanpa kolom endpoint), pakai api_logs.jsonl"""
+    records = [r for r in iter_json_records(source) if isinstance(r, dict) and 'endpoint' in r]
+    if not records:
+        print(f"{source} has no joined records, using api_logs.jsonl as sample")
+        records = list(iter_json_records('api_logs.jsonl'))
+    return records
+
+
+def build_inputs(records: list, replication: int):
+    """Tulis sampel x replication sebagai JSON array (indent 2) dan NDJSON; return (array_path, ndjson_path)"""
+    fd, array_path = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w') as out:
+        out.write('[')
+        separator = '\n'
+        for _ in range(replication):
+            for record in records:
+                out.write(separator + json.dumps(record, indent=2))
+                separator = ',\n'
+        out.write('\n]')
+    fd, ndjson_path = tempfile.mkstemp(suffix='.jsonl')
+    with os.fdopen(fd, 'w') as out:
+        lines = ''.join(json.dumps(record) + '\n' for record in records)
+        for _ in range(replication):
+            out.write(lines)
+    return array_path, ndjson_path
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS process ini; VmHWM di-reset saat exec, ru_maxrss (fallback) ikut mewarisi parent"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(func, path, queue):
+    start = time.perf_counter()
+    result = func(path)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, peak_rss_mb(), json.dumps(result)))
+
+
+def run_isolated(func, path):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(func, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'output_data.json'
+    replications = [int(r) for r in sys.argv[2:]] or [10, 100]
+    records = load_sample(source)
+    print(f"Sample: {len(records):,} records")
+    print(f"{'input':>8} {'variant':>22} {'MB':>8} {'seconds':>9} {'peak RSS MB':>12} {'speedup':>8}")
+
+    for replication in replications:
+        array_path, ndjson_path = build_inputs(records, replication)
+        try:
+            baseline, expected = None, None
+            variants = [('json.load + 3 loops', legacy_aggregate, array_path),
+                        ('streaming array', streaming_aggregate, array_path),
+                        ('streaming ndjson', streaming_aggregate, ndjson_path)]
+            for name, func, path in variants:
+                seconds, peak_mb, result = run_isolated(func, path)
+                if expected is None:
+                    baseline, expected = seconds, result
+                elif result != expected:
+                    raise AssertionError(f"{name} result differs from json.load version")
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                print(f"{f'x{replication}':>8} {name:>22} {size_mb:>8.1f} {seconds:>9.2f} {peak_mb:>12.1f} "
+                      f"{baseline / seconds:>7.2f}x")
+        finally:
+            os.remove(array_path)
+            os.remove(ndjson_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark batch (columnar) transform vs transform per-record
+
+Usage:
+    python benchmarks/bench_batch_transform.py [source.jsonl] [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extractors.columnar import COLUMN_SCHEMAS, ColumnarBatch
+from src.extractors.extract import Extract
+from src.transformers.transform import (Transform, add_response_category, add_response_category_batch,
+                                        anonymize_user_id, anonymize_user_id_batch, parse_timestamp,
+                                        parse_timestamp_batch)
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'api_logs.jsonl'
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    sample = Extract('api_logs', source).extract_data()
+    records = (sample * (rows // len(sample) + 1))[:rows]
+    columns = {key: [record.get(key) for record in records] for key in records[0]}
+    batch = ColumnarBatch.from_columns(columns, schema=COLUMN_SCHEMAS['api_logs'])
+    records = [dict(record) for record in records]
+    print(f"Rows: {rows:,}")
+
+    per_record = Transform([parse_timestamp, add_response_category, anonymize_user_id])
+    start = time.perf_counter()
+    per_record.apply_transforms(records)
+    record_seconds = time.perf_counter() - start
+    print(f"{'per-record':>12}: {record_seconds:.2f}s")
+
+    batched = Transform([parse_timestamp_batch, add_response_category_batch, anonymize_user_id_batch])
+    start = time.perf_counter()
+    batched.apply_transforms(batch)
+    batch_seconds = time.perf_counter() - start
+    print(f"{'batch':>12}: {batch_seconds:.2f}s")
+    print(f"speedup: {record_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
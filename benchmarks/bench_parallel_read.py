@@ -0,0 +1,54 @@
+"""
+Benchmark parallel JSONL reader: records/sec vs jumlah worker
+
+Usage:
+    python benchmarks/bench_parallel_read.py [source.jsonl] [replication]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extractors.parallel_reader import read_jsonl_parallel
+
+
+def build_input(source: str, replication: int) -> str:
+    """Perbesar file sumber dengan mengulang isinya sebanyak replication kali"""
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    with os.fdopen(fd, 'wb') as out:
+        for _ in range(replication):
+            with open(source, 'rb') as src:
+                shutil.copyfileobj(src, out)
+    return path
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'api_logs.jsonl'
+    replication = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    path = build_input(source, replication)
+
+    try:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"Input: {source} x{replication} ({size_mb:.1f} MB)")
+        print(f"{'workers':>8} {'seconds':>10} {'records/sec':>14} {'speedup':>8}")
+
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, 16, 32, cpu_count} & set(range(1, cpu_count + 1)))
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            columns = read_jsonl_parallel(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            records = len(next(iter(columns.values()), []))
+            rate = records / elapsed
+            baseline = baseline or rate
+            print(f"{workers:>8} {elapsed:>10.2f} {rate:>14,.0f} {rate / baseline:>7.2f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
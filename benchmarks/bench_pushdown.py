@@ -0,0 +1,59 @@
+"""
+Benchmark predicate/projection pushdown vs full parse + filter
+
+Usage:
+    python benchmarks/bench_pushdown.py [source.jsonl] [replication] [predicate]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_read import build_input
+from src.extractors.pushdown import ERROR_LOGS_PREDICATE, Pushdown
+
+
+def full_parse(path: str, pushdown: Pushdown) -> int:
+    count = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            record = json.loads(line)
+            if all(p.evaluate(record) for p in pushdown.predicates):
+                count += 1
+    return count
+
+
+def pushdown_parse(path: str, pushdown: Pushdown) -> int:
+    count = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if pushdown.apply(line) is not None:
+                count += 1
+    return count
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'api_logs.jsonl'
+    replication = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    predicate = sys.argv[3] if len(sys.argv) > 3 else ERROR_LOGS_PREDICATE
+    path = build_input(source, replication)
+    pushdown = Pushdown.from_config(columns=['user_id', 'status_code'], predicate=predicate)
+
+    try:
+        print(f"Input: {source} x{replication}, predicate: {predicate}")
+        results = {}
+        for name, func in [('full parse', full_parse), ('pushdown', pushdown_parse)]:
+            start = time.perf_counter()
+            matched = func(path, pushdown)
+            results[name] = time.perf_counter() - start
+            print(f"{name:>12}: {results[name]:.2f}s ({matched:,} rows matched)")
+        print(f"speedup: {results['full parse'] / results['pushdown']:.2f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
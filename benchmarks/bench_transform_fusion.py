@@ -0,0 +1,52 @@
+"""
+Benchmark fusion transform per-record: satu traversal vs satu traversal per transform
+
+Usage:
+    python benchmarks/bench_transform_fusion.py [source.jsonl] [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extractors.extract import Extract
+from src.transformers.transform import Transform, add_response_category
+
+
+def unfused(transforms, data):
+    """Cara lama: setiap transform membuat list baru"""
+    for transform in transforms:
+        data = [transform(item) for item in data]
+    return data
+
+
+def best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'api_logs.jsonl'
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    sample = Extract('api_logs', source).extract_data()
+    data = [dict(record) for record in (sample * (rows // len(sample) + 1))[:rows]]
+    print(f"Rows: {rows:,}")
+    print(f"{'chain':>6} {'unfused':>10} {'fused':>10} {'speedup':>8}")
+
+    for length in range(1, 11):
+        transforms = [add_response_category] * length
+
+        unfused_seconds = best_of(lambda: unfused(transforms, data))
+        fused_seconds = best_of(lambda: Transform(transforms).apply_transforms(data))
+
+        print(f"{length:>6} {unfused_seconds:>9.2f}s {fused_seconds:>9.2f}s {unfused_seconds / fused_seconds:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
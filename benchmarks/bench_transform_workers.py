@@ -0,0 +1,53 @@
+"""
+Benchmark throughput transform per-record vs jumlah worker process
+
+Usage:
+    python benchmarks/bench_transform_workers.py [source.jsonl] [rows] [chunk_size]
+"""
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extractors.extract import Extract
+from src.transformers.transform import Transform, add_response_category
+
+
+def hash_user_id(data):
+    """Transform CPU-heavy untuk simulasi (hash berulang)"""
+    if 'user_id' in data:
+        digest = data['user_id'].encode('utf-8')
+        for _ in range(200):
+            digest = hashlib.sha256(digest).digest()
+        data['user_hash'] = digest.hex()
+    return data
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'api_logs.jsonl'
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    chunk_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    sample = Extract('api_logs', source).extract_data()
+    records = (sample * (rows // len(sample) + 1))[:rows]
+    print(f"Rows: {rows:,}, chunk_size: {chunk_size:,}")
+    print(f"{'workers':>8} {'seconds':>10} {'records/sec':>14} {'speedup':>8}")
+
+    cpu_count = os.cpu_count() or 1
+    baseline = None
+    for workers in sorted({1, 2, 4, 8, 16, 32, cpu_count} & set(range(1, cpu_count + 1))):
+        data = [dict(record) for record in records]
+        transform = Transform([hash_user_id, add_response_category], workers=workers, chunk_size=chunk_size)
+        start = time.perf_counter()
+        transform.apply_transforms(data)
+        elapsed = time.perf_counter() - start
+        transform.close()
+        rate = rows / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>10.2f} {rate:>14,.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
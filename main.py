@@ -1,12 +1,31 @@
+import numpy as np
 import pandas as pd
+import itertools
 import json
 import os
 import yaml
 import logging
+from typing import Optional
 from config.config import Config
+from src.aggregators.aggregation import ACTIVITY_REPORTS, API_REPORTS, ENRICHMENT_REPORTS, AggregationEngine
+from src.aggregators.inter_event import (ACTIVITY_TIME_SPAN, format_inter_event_report, inter_event_stats,
+                                         mean_gap_from_span)
+from src.aggregators.rollup import RollupCube
+from src.aggregators.state import AggregateStateStore
+from src.extractors.bloom import semi_join_filter
+from src.extractors.cache import SourceCache
+from src.extractors.checkpoint import CheckpointStore
+from src.extractors.columnar import COLUMN_SCHEMAS
+from src.extractors.extract import DEFAULT_BATCH_SIZE, Extract
+from src.extractors.pushdown import Pushdown
 from src.loaders.load import Load
+from src.transformers.asof_join import asof_join
 from src.transformers.enrichment import DataEnrichment
+from src.transformers.grace_join import grace_hash_join
+from src.transformers.join_planner import estimate_join_size, join_weights, joined_order, pre_aggregate_logs
+from src.transformers.spill_join import DEFAULT_MEMORY_BUDGET_MB, sort_merge_join
 from src.transformers.validation import DataValidator
+from src.utils.timestamps import NAT, epoch_us_to_datetime64, parse_iso_timestamps
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +49,87 @@ def load_api_config(config_path: str = 'config/api_config.yaml') -> dict:
         logger.error(f"Failed to load API config: {e}")
         return {}
 
+def joined_records_to_frame(joined) -> pd.DataFrame:
+    """Bangun DataFrame hasil join secara bertahap per chunk (timestamp di-parse per chunk)"""
+    chunks = []
+    for chunk in iter(lambda: list(itertools.islice(joined, DEFAULT_BATCH_SIZE)), []):
+        chunk_df = pd.DataFrame.from_records(chunk)
+        for column in ('timestamp_x', 'timestamp_y'):
+            if column in chunk_df:
+                chunk_df[column] = epoch_us_to_datetime64(parse_iso_timestamps(chunk_df[column].to_numpy()))
+        chunks.append(chunk_df)
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+def with_schema_columns(df: pd.DataFrame, source_type: str) -> pd.DataFrame:
+    """Frame kosong tanpa kolom (mis. run incremental tanpa data baru) diberi kolom dari schema default"""
+    if len(df.columns):
+        return df
+    data_types = DataValidator().get_default_schema()[source_type]['data_types']
+    return pd.DataFrame({column: pd.Series(dtype='datetime64[us]' if kind == 'datetime' else object)
+                         for column, kind in data_types.items()})
+
+def sort_merge_join_sources(activities_path: str, logs_path: str, join_config: dict,
+                            activities_pushdown: Optional[Pushdown] = None) -> pd.DataFrame:
+    """Join source file dengan external sort-merge join"""
+    def records(source_type, path, pushdown=None):
+        for batch in Extract(source_type, path, pushdown=pushdown).extract_batches():
+            yield from batch
+
+    return joined_records_to_frame(sort_merge_join(
+        records('user_activities', activities_path, activities_pushdown), records('api_logs', logs_path),
+        key='user_id', suffixes=('_x', '_y'),
+        memory_budget_mb=join_config.get('memory_budget_mb', DEFAULT_MEMORY_BUDGET_MB),
+        spill_dir=join_config.get('spill_dir')))
+
+def grace_join_sources(activities_path: str, logs_path: str, join_config: dict) -> pd.DataFrame:
+    """Join source file dengan grace hash join (partisi di disk, opsional paralel)"""
+    return joined_records_to_frame(grace_hash_join(
+        activities_path, logs_path, key='user_id', suffixes=('_x', '_y'),
+        memory_budget_mb=join_config.get('memory_budget_mb', DEFAULT_MEMORY_BUDGET_MB),
+        num_partitions=join_config.get('num_partitions'), workers=join_config.get('workers') or 1,
+        spill_dir=join_config.get('spill_dir'), skew_factor=join_config.get('skew_factor')))
+
+def update_rollup(path: str, logs_df: pd.DataFrame, logs_extract: Extract, schema: Optional[dict] = None,
+                  workers: Optional[int] = None) -> RollupCube:
+    """
+    Tulis rollup semua request api_logs per minute/hour/day ke `path`
+
+    Cube menyimpan checkpoint api_logs yang sudah tercakup (covers). Pada run
+    incremental, cube dari run sebelumnya dilanjutkan dengan data baru jika
+    covers-nya sama dengan checkpoint yang sudah di-commit; jika sama dengan
+    checkpoint baru (run sebelumnya berhenti sebelum commit), cube dipakai apa
+    adanya sehingga data tidak dihitung dua kali. Selain itu cube dibangun
+    ulang dari awal file sampai checkpoint baru, bukan hanya dari data baru.
+    """
+    def covers(checkpoint):
+        return {'offset': checkpoint['offset'], 'tail_hash': checkpoint['tail_hash']} if checkpoint else None
+
+    pending = logs_extract.pending_checkpoint
+    if os.path.exists(path) and pending is not None:
+        previous = RollupCube.read(path)
+        committed = logs_extract.checkpoint_store.get(logs_extract.path)
+        if previous.covers is not None and previous.covers == covers(pending):
+            return previous
+        if previous.covers is not None and previous.covers == covers(committed):
+            if len(logs_df):
+                previous.update(logs_df)
+            previous.covers = covers(pending)
+            previous.write(path)
+            return previous
+
+    rollup = RollupCube()
+    if logs_extract.read_start > 0:
+        # logs_df hanya berisi data baru; cube harus mencakup seluruh file sampai checkpoint baru
+        logger.warning(f"Rollup {path} does not cover the committed api_logs checkpoint, "
+                       f"rebuilding it from bytes 0-{pending['offset']} of {logs_extract.path}")
+        history = logs_extract.extract_columnar_range(0, pending['offset'], workers=workers, schema=schema)
+        logs_df = history.to_dataframe(decode=True, parse_dates=True)
+    if len(logs_df):
+        rollup.update(logs_df)
+    rollup.covers = covers(pending)
+    rollup.write(path)
+    return rollup
+
 def main():
     # Load konfigurasi
     config = Config(config_path='config/config.yaml')
@@ -46,10 +146,73 @@ def main():
         logger.warning("No API configuration found. Running without external API enrichment.")
         api_config = {}
 
+    join_config = config.get('join') or {}
+    # Mode agregasi: 'joined' = di frame hasil join; 'weighted' = dari tabel sumber dengan bobot
+    # multiplicity join (angka sama dengan 'joined'); 'source' = count per baris sumber yang ter-join.
+    # Mode sumber hanya berlaku untuk equi-join biasa tanpa enrichment (kolom enrichment ada di hasil join)
+    aggregation_config = config.get('aggregation') or {}
+    chunk_size = aggregation_config.get('chunk_size')
+    aggregation_mode = aggregation_config.get('mode') or 'joined'
+    source_level = (aggregation_mode in ('weighted', 'source') and not api_config
+                    and not join_config.get('pre_aggregate_logs')
+                    and join_config.get('strategy', 'pandas') in ('pandas', 'sort_merge', 'grace'))
+    if aggregation_mode != 'joined' and not source_level:
+        logger.warning(f"Aggregation mode {aggregation_mode} needs a plain equi-join without enrichment, "
+                       f"falling back to aggregating the joined frame")
+
+    # Incremental: hanya data yang di-append sejak run terakhir yang dibaca, dan state agregasi
+    # (count/sum/min/max per user dan grup) di-merge dengan state tersimpan
+    extract_config = config.get('extract') or {}
+    checkpoint_store = None
+    if extract_config.get('incremental'):
+        checkpoint_store = CheckpointStore(extract_config.get('checkpoint_path', '.checkpoints/extract.json'))
+    state_store = None
+    if aggregation_config.get('state_path'):
+        if source_level and checkpoint_store:
+            state_store = AggregateStateStore(aggregation_config['state_path'])
+            state_store.restore_checkpoints(checkpoint_store)
+        else:
+            logger.warning("Aggregate state needs extract.incremental and aggregation mode weighted or source, "
+                           "ignoring state_path")
+
     # Membaca data ke dalam DataFrame
     logger.info("Reading data files...")
-    activities_df = pd.read_json(user_activities_path, lines=True)
-    logs_df = pd.read_json(api_logs_path, lines=True)
+    workers = extract_config.get('workers')
+    cache = SourceCache(extract_config['cache_dir']) if extract_config.get('cache_dir') else None
+    if cache:
+        cache.evict_stale()
+
+    # response_time tetap float64 supaya hasil agregasi sama persis
+    logs_schema = {**COLUMN_SCHEMAS['api_logs'], 'response_time': 'float64'}
+    # Timestamp di-parse sekali saat extraction dan dipakai ulang di semua stage
+    logs_extract = Extract('api_logs', api_logs_path, checkpoint_store=checkpoint_store)
+    logs_df = logs_extract.extract_columnar(
+        workers=workers, cache=cache, schema=logs_schema).to_dataframe(decode=True, parse_dates=True)
+
+    # Semi-join pushdown: activity tanpa user di api_logs tidak akan lolos inner join,
+    # jadi dibuang saat membaca (Bloom filter user_id api_logs) sebelum di-decode.
+    # Tidak dipakai saat incremental: activity baru bisa ter-join dengan request lama
+    semi_join_report = None
+    activities_pushdown = None
+    if join_config.get('semi_join_filter') and join_config.get('strategy') != 'grace' and not checkpoint_store:
+        semi_join = semi_join_filter(logs_df['user_id'], field='user_id', fp_rate=join_config.get('bloom_fp_rate'))
+        activities_pushdown = Pushdown(predicates=[semi_join])
+        logger.info(f"Semi-join filter on api_logs user_id: {semi_join.bloom!r} ({semi_join.bloom.nbytes} bytes)")
+
+    activities_extract = Extract('user_activities', user_activities_path, checkpoint_store=checkpoint_store,
+                                 pushdown=activities_pushdown)
+    activities_df = activities_extract.extract_columnar(
+        workers=workers, cache=cache).to_dataframe(decode=True, parse_dates=True)
+    activities_df = with_schema_columns(activities_df, 'user_activities')
+    logs_df = with_schema_columns(logs_df, 'api_logs')
+    if activities_pushdown:
+        semi_join_report = {
+            'bloom_fp_rate': semi_join.bloom.fp_rate,
+            'bloom_bytes': semi_join.bloom.nbytes,
+            'activities_rows_read': len(activities_df) + activities_extract.pruned_rows,
+            'activities_rows_pruned': activities_extract.pruned_rows,
+        }
+        logger.info(f"Semi-join filter pruned {activities_extract.pruned_rows} activity rows")
 
     # Data Validation
     logger.info("Validating data...")
@@ -65,6 +228,8 @@ def main():
     
     # Generate validation report
     validation_report = validator.generate_report()
+    if semi_join_report:
+        validation_report['semi_join_filter'] = semi_join_report
     
     # Save validation report
     with open('validation_report.json', 'w') as f:
@@ -74,123 +239,169 @@ def main():
 
     # Join berdasarkan user_id
     logger.info("Joining data...")
-    merged_df = pd.merge(activities_df, logs_df, on='user_id', how='inner')
-
-    # Enrich data dengan external APIs
-    if api_config:
-        logger.info("Enriching data with external APIs...")
-        try:
-            enrichment = DataEnrichment(api_config)
-            enriched_df = enrichment.enrich_user_data(merged_df)
-            enrichment.close()
-            logger.info("Data enrichment completed successfully")
-        except Exception as e:
-            logger.error(f"Data enrichment failed: {e}")
+    join_estimate = estimate_join_size(activities_df['user_id'], logs_df['user_id'])
+    logger.info(f"Join estimate: {join_estimate['left_rows']} x {join_estimate['right_rows']} rows -> "
+                f"{join_estimate['output_rows']} rows (fan-out x{join_estimate['fanout']:.1f}, "
+                f"{join_estimate['matched_keys']} matched keys)")
+
+    # Frame hasil join hanya dibangun jika memang dibutuhkan
+    write_joined = (config.get('output') or {}).get('joined_data', True)
+
+    enriched_df = None
+    if write_joined or not source_level:
+        # Sumber untuk agregasi API; default hasil join (setiap request dihitung per pasangan activity)
+        api_df = None
+        if join_config.get('pre_aggregate_logs'):
+            # Join many-to-one dengan ringkasan per user, tanpa fan-out
+            logger.info("Pre-aggregating api logs per user before join...")
+            merged_df = pd.merge(activities_df.rename(columns={'timestamp': 'timestamp_x'}),
+                                 pre_aggregate_logs(logs_df), on='user_id', how='inner')
+            api_df = logs_df[logs_df['user_id'].isin(activities_df['user_id'])]
+        elif join_config.get('strategy') == 'asof':
+            # Setiap activity dipasangkan dengan request terdekat dari user yang sama
+            merged_df = asof_join(activities_df, logs_df, key='user_id', on='timestamp',
+                                  tolerance=join_config.get('asof_tolerance'),
+                                  direction=join_config.get('asof_direction', 'nearest'))
+        elif join_config.get('strategy') == 'sort_merge':
+            merged_df = sort_merge_join_sources(user_activities_path, api_logs_path, join_config, activities_pushdown)
+        elif join_config.get('strategy') == 'grace':
+            merged_df = grace_join_sources(user_activities_path, api_logs_path, join_config)
+        else:
+            merged_df = pd.merge(activities_df, logs_df, on='user_id', how='inner')
+
+        # Enrich data dengan external APIs
+        if api_config:
+            logger.info("Enriching data with external APIs...")
+            try:
+                enrichment = DataEnrichment(api_config)
+                enriched_df = enrichment.enrich_user_data(merged_df)
+                enrichment.close()
+                logger.info("Data enrichment completed successfully")
+            except Exception as e:
+                logger.error(f"Data enrichment failed: {e}")
+                enriched_df = merged_df
+        else:
             enriched_df = merged_df
-    else:
-        enriched_df = merged_df
 
-    # Simpan hasil join ke file
-    enriched_df.to_json('output_data.json', orient='records', lines=False, indent=2)
+        # Simpan hasil join ke file
+        enriched_df.to_json('output_data.json', orient='records', lines=False, indent=2)
 
     # Agregasi dengan data yang sudah di-enrich
     logger.info("Generating aggregated reports...")
-    
-    # Basic aggregations
-    action_counts = enriched_df['action'].value_counts().to_dict() if 'action' in enriched_df else {}
-    page_visit_counts = enriched_df['page_url'].value_counts().to_dict() if 'page_url' in enriched_df else {}
-    device_counts = enriched_df['device_type'].value_counts().to_dict() if 'device_type' in enriched_df else {}
-    
-    # Time-based aggregations
-    enriched_df['timestamp_x'] = pd.to_datetime(enriched_df['timestamp_x'])
-    enriched_df['timestamp_y'] = pd.to_datetime(enriched_df['timestamp_y'])
-    
-    if 'timestamp_x' in enriched_df:
-        enriched_df['time_diff'] = enriched_df.groupby('user_id')['timestamp_x'].diff()
-        enriched_df['time_diff'].fillna('0 days 00:00:00', inplace=True)
-        avg_time_diff_per_user = enriched_df.groupby('user_id')['time_diff'].apply(lambda x: pd.to_timedelta(x).mean()).astype(str).to_dict()
+
+    if state_store:
+        # State per user: bobot join memakai jumlah baris per user di sisi lain dari semua run,
+        # sehingga activity baru tetap ter-join dengan request lama (dan sebaliknya)
+        activity_reports = ACTIVITY_REPORTS + [ACTIVITY_TIME_SPAN]
+        activity_engine = state_store.engine('user_activities', activity_reports, key='user_id')
+        log_engine = state_store.engine('api_logs', API_REPORTS, key='user_id')
+        if len(activities_df):
+            timestamp_us = parse_iso_timestamps(activities_df['timestamp'].to_numpy())
+            new_activities = activities_df.assign(
+                timestamp_us=np.where(timestamp_us == NAT, np.nan, timestamp_us.astype(np.float64)))
+            partial = AggregationEngine(activity_reports, key='user_id')
+            partial.run(new_activities, chunk_size=chunk_size)
+            activity_engine.merge(partial)
+        if len(logs_df):
+            partial = AggregationEngine(API_REPORTS, key='user_id')
+            partial.run(logs_df, chunk_size=chunk_size)
+            log_engine.merge(partial)
+        logger.info(f"Aggregate state: {activity_engine.rows} activities, {log_engine.rows} api logs "
+                    f"({len(activities_df)} and {len(logs_df)} new)")
+
+        if aggregation_mode == 'weighted':
+            activity_weights, log_weights = log_engine.key_counts, activity_engine.key_counts
+        else:
+            activity_weights = dict.fromkeys(log_engine.key_counts, 1)
+            log_weights = dict.fromkeys(activity_engine.key_counts, 1)
+        report_engines = [(activity_engine, activity_weights), (log_engine, log_weights)]
+        joined_activities = None
+    elif source_level:
+        activity_weights, log_weights = join_weights(activities_df['user_id'], logs_df['user_id'])
+        matched = activity_weights > 0
+        joined_activities = activities_df[matched].assign(join_weight=activity_weights[matched])
+        # Urutan request mengikuti kemunculan pertama di hasil join (tie-break value_counts sama)
+        log_order = joined_order(activities_df['user_id'], logs_df['user_id'])
+        joined_logs = logs_df.iloc[log_order].assign(join_weight=log_weights[log_order])
+        weight = 'join_weight' if aggregation_mode == 'weighted' else None
+        logger.info(f"Aggregating {len(joined_activities)} activities and {len(joined_logs)} api logs "
+                    f"at source level ({aggregation_mode})")
+        activity_engine, log_engine = AggregationEngine(ACTIVITY_REPORTS), AggregationEngine(API_REPORTS)
+        activity_engine.run(joined_activities, chunk_size=chunk_size, weight=weight)
+        log_engine.run(joined_logs, chunk_size=chunk_size, weight=weight)
+        report_engines = [(activity_engine, None), (log_engine, None)]
     else:
-        avg_time_diff_per_user = {}
-    
-    # API-related aggregations
-    status_code_counts = enriched_df['status_code'].value_counts().to_dict() if 'status_code' in enriched_df else {}
-    avg_response_time_per_endpoint = enriched_df.groupby('endpoint')['response_time'].mean().to_dict() if 'endpoint' in enriched_df else {}
-    request_counts_per_user = enriched_df['user_id'].value_counts().to_dict()
+        # Semua report count/mean/min/max dievaluasi dalam satu pass per sumber data
+        # (dengan pre-aggregation, report API dihitung per request dari api_logs yang ter-join)
+        joined_activities = None
+        if 'timestamp_x' in enriched_df:
+            joined_activities = activities_df[activities_df['user_id'].isin(enriched_df['user_id'].unique())]
+        if api_df is None:
+            engine = AggregationEngine(ACTIVITY_REPORTS + API_REPORTS + ENRICHMENT_REPORTS)
+            engine.run(enriched_df, chunk_size=chunk_size)
+            report_engines = [(engine, None)]
+        else:
+            engine, log_engine = AggregationEngine(ACTIVITY_REPORTS + ENRICHMENT_REPORTS), AggregationEngine(API_REPORTS)
+            engine.run(enriched_df, chunk_size=chunk_size)
+            log_engine.run(api_df, chunk_size=chunk_size)
+            report_engines = [(engine, None), (log_engine, None)]
 
-    # New enriched aggregations
-    enriched_aggregations = {}
-    
-    # User profile based aggregations
-    if 'user_age' in enriched_df:
-        age_distribution = enriched_df['user_age'].value_counts().to_dict()
-        enriched_aggregations['age_distribution'] = age_distribution
-    
-    if 'user_gender' in enriched_df:
-        gender_distribution = enriched_df['user_gender'].value_counts().to_dict()
-        enriched_aggregations['gender_distribution'] = gender_distribution
-    
-    if 'user_premium' in enriched_df:
-        premium_user_stats = enriched_df['user_premium'].value_counts().to_dict()
-        enriched_aggregations['premium_user_stats'] = premium_user_stats
-    
-    # Location based aggregations
-    if 'country' in enriched_df:
-        country_distribution = enriched_df['country'].value_counts().to_dict()
-        enriched_aggregations['country_distribution'] = country_distribution
-    
-    if 'city' in enriched_df:
-        city_distribution = enriched_df['city'].value_counts().to_dict()
-        enriched_aggregations['city_distribution'] = city_distribution
-    
-    # Weather based aggregations
-    if 'weather_condition' in enriched_df:
-        weather_distribution = enriched_df['weather_condition'].value_counts().to_dict()
-        enriched_aggregations['weather_distribution'] = weather_distribution
-    
-    if 'temperature' in enriched_df:
-        temp_stats = {
-            'avg_temperature': enriched_df['temperature'].mean(),
-            'min_temperature': enriched_df['temperature'].min(),
-            'max_temperature': enriched_df['temperature'].max()
-        }
-        enriched_aggregations['temperature_stats'] = temp_stats
-
-    # Simpan hasil agregat ke file
-    output_files = [
-        ('action_counts.json', action_counts),
-        ('page_visit_counts.json', page_visit_counts),
-        ('device_counts.json', device_counts),
-        ('avg_time_diff_per_user.json', avg_time_diff_per_user),
-        ('status_code_counts.json', status_code_counts),
-        ('avg_response_time_per_endpoint.json', avg_response_time_per_endpoint),
-        ('request_counts_per_user.json', request_counts_per_user),
-    ]
-    
-    # Add enriched aggregations
-    for name, data in enriched_aggregations.items():
-        output_files.append((f'{name}.json', data))
-    
-    for fname, data in output_files:
-        with open(fname, 'w') as f:
+    # Time-based aggregations: jeda antar activity per user dari activities yang ter-join,
+    # diurutkan per (user, timestamp) sekali dan dihitung vectorized (lihat inter_event_stats)
+    time_reports = {}
+    if state_store:
+        # Median/p95 jeda tidak mergeable; dari state hanya mean yang bisa dihitung ulang
+        mean_gap = mean_gap_from_span(activity_engine, users=log_engine.key_counts)
+        time_reports['avg_time_diff_per_user'] = pd.to_timedelta(mean_gap, unit='us').astype(str).to_dict()
+    elif joined_activities is not None:
+        inter_event = inter_event_stats(joined_activities['user_id'].to_numpy(),
+                                        parse_iso_timestamps(joined_activities['timestamp'].to_numpy()))
+        time_reports['avg_time_diff_per_user'] = pd.to_timedelta(inter_event['mean'], unit='us').astype(str).to_dict()
+        time_reports['inter_event_time_per_user'] = format_inter_event_report(inter_event)
+    else:
+        time_reports['avg_time_diff_per_user'] = {}
+        time_reports['inter_event_time_per_user'] = {}
+
+    # Simpan hasil agregat ke file: report engine ditulis oleh engine-nya (sketch HyperLogLog
+    # report distinct sebagai state binary di samping JSON-nya), report time-based di sini
+    report_names = [a.name for a in ACTIVITY_REPORTS + API_REPORTS + ENRICHMENT_REPORTS]
+    output_files = []
+    for engine, weights in report_engines:
+        output_files += engine.write('.', weights=weights, names=report_names)
+        engine.write_sketches('.', weights=weights)
+    for name, data in time_reports.items():
+        with open(f'{name}.json', 'w') as f:
             json.dump(data, f, indent=2)
+        output_files.append(f'{name}.json')
+
+    # Rollup semua request api_logs (tanpa join) per minute/hour/day untuk dashboard
+    if aggregation_config.get('rollup_path'):
+        update_rollup(aggregation_config['rollup_path'], logs_df, logs_extract, schema=logs_schema, workers=workers)
 
     # Upload semua file output ke S3
     logger.info("Uploading files to S3...")
     loader = Load(destination='both', bucket='belajarde', region='ap-southeast-2')
     
-    # Upload main data
-    with open('output_data.json', 'r') as f:
-        loader.load_data(json.load(f), s3_key='output_data.json')
-    
-    # Upload validation report
-    with open('validation_report.json', 'r') as f:
-        loader.load_data(json.load(f), s3_key='validation_report.json')
-    
-    # Upload aggregations
-    for fname, _ in output_files:
+    # Upload main data, validation report, lalu aggregations
+    upload_files = (['output_data.json'] if enriched_df is not None else []) + ['validation_report.json']
+    upload_files += output_files
+    uploaded = True
+    for fname in upload_files:
         with open(fname, 'r') as f:
-            loader.load_data(json.load(f), s3_key=fname)
-    
+            uploaded = loader.load_data(json.load(f), s3_key=os.path.basename(fname)) and uploaded
+
+    # State dan checkpoint disimpan setelah semua output berhasil di-load; gagal sebelum titik ini
+    # berarti data baru dibaca ulang di run berikutnya
+    if not uploaded:
+        logger.error("Some outputs failed to load, aggregate state and checkpoints were not committed")
+        return
+    if state_store:
+        state_store.save({'user_activities': activity_engine, 'api_logs': log_engine},
+                         {user_activities_path: activities_extract.pending_checkpoint,
+                          api_logs_path: logs_extract.pending_checkpoint})
+    activities_extract.commit_checkpoint()
+    logs_extract.commit_checkpoint()
+
     logger.info("Pipeline completed successfully!")
 
 if __name__ == "__main__":
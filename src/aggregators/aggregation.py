@@ -0,0 +1,553 @@
+import base64
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from src.aggregators.hyperloglog import DEFAULT_PRECISION, HyperLogLog, hash_values, write_sketches
+from src.aggregators.tdigest import DEFAULT_COMPRESSION, DEFAULT_QUANTILES, TDigest
+
+# Jenis agregasi yang didukung
+AGGREGATION_KINDS = ('count', 'mean', 'min', 'max', 'summary', 'span', 'percentiles', 'distinct')
+
+# Kind dengan state berupa sketch (bukan [count, sum, min, max])
+SKETCH_KINDS = ('percentiles', 'distinct')
+
+# Kind dengan state [count, sum, min, max] per grup; state tersimpan bisa dipakai antar kind ini
+GROUP_STATS_KINDS = ('mean', 'min', 'max', 'span')
+
+# Statistik untuk kind 'summary', urutannya sama dengan temperature_stats di main.py
+SUMMARY_STATS = ('avg', 'min', 'max')
+
+
+class Aggregation:
+    def __init__(self, name: str, kind: str, column: Optional[str] = None,
+                 by: Optional[Union[str, Tuple[str, ...]]] = None, optional: bool = False,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES, compression: float = DEFAULT_COMPRESSION,
+                 precision: int = DEFAULT_PRECISION):
+        """
+        Satu report agregasi secara deklaratif
+
+        - count:   frekuensi nilai `by` (seperti value_counts().to_dict())
+        - mean/min/max: statistik `column` per grup `by` (seperti groupby(by)[column].mean())
+        - summary: avg/min/max `column` di seluruh data, key "{stat}_{column}"
+        - span: {'count', 'first', 'last'} `column` per grup `by` (count nilai
+          non-null, min dan max), mis. rentang timestamp per user
+        - percentiles: count dan quantile `column` per grup `by` dari TDigest
+          (bounded memory, mergeable; lihat error bound di TDigest)
+        - distinct: perkiraan jumlah nilai unik `column` per grup `by` dari
+          HyperLogLog, urut menurun seperti count
+
+        Args:
+            name: Nama report (file output "{name}.json")
+            kind: Salah satu AGGREGATION_KINDS
+            column: Kolom nilai (mean/min/max/summary/span/percentiles/distinct)
+            by: Kolom grup, atau tuple kolom (hasil berupa dict bertingkat per kolom)
+            optional: True = report tidak ditulis sama sekali jika kolomnya tidak ada;
+                      False = ditulis sebagai {}
+            quantiles: Quantile yang dilaporkan (percentiles)
+            compression: Compression TDigest (percentiles)
+            precision: Precision HyperLogLog (distinct)
+        """
+        if kind not in AGGREGATION_KINDS:
+            raise ValueError(f"Unsupported aggregation: {kind}. Use one of {AGGREGATION_KINDS}")
+        if kind != 'summary' and by is None:
+            raise ValueError(f"Aggregation {name!r} ({kind}) needs a 'by' column")
+        if kind != 'count' and column is None:
+            raise ValueError(f"Aggregation {name!r} ({kind}) needs a value column")
+        self.name = name
+        self.kind = kind
+        self.column = column
+        self.by = by
+        self.optional = optional
+        self.quantiles = tuple(quantiles)
+        self.compression = compression
+        self.precision = precision
+
+    def __repr__(self) -> str:
+        return f"Aggregation({self.name}: {self.kind} {self.column or ''} by {self.by})"
+
+    @property
+    def by_columns(self) -> List[str]:
+        if self.by is None:
+            return []
+        return [self.by] if isinstance(self.by, str) else list(self.by)
+
+    @property
+    def columns(self) -> List[str]:
+        return self.by_columns + ([self.column] if self.column is not None else [])
+
+
+# Report di main.py. Basic report selalu ditulis, report enrichment hanya jika kolomnya ada
+ACTIVITY_REPORTS = [
+    Aggregation('action_counts', 'count', by='action'),
+    Aggregation('page_visit_counts', 'count', by='page_url'),
+    Aggregation('device_counts', 'count', by='device_type'),
+    Aggregation('unique_users_per_page', 'distinct', column='user_id', by='page_url'),
+]
+
+API_REPORTS = [
+    Aggregation('status_code_counts', 'count', by='status_code'),
+    Aggregation('avg_response_time_per_endpoint', 'mean', column='response_time', by='endpoint'),
+    Aggregation('request_counts_per_user', 'count', by='user_id'),
+    Aggregation('response_time_percentiles_per_endpoint', 'percentiles', column='response_time',
+                by=('endpoint', 'method')),
+    Aggregation('unique_users_per_endpoint', 'distinct', column='user_id', by='endpoint'),
+]
+
+ENRICHMENT_REPORTS = [
+    Aggregation('age_distribution', 'count', by='user_age', optional=True),
+    Aggregation('gender_distribution', 'count', by='user_gender', optional=True),
+    Aggregation('premium_user_stats', 'count', by='user_premium', optional=True),
+    Aggregation('country_distribution', 'count', by='country', optional=True),
+    Aggregation('city_distribution', 'count', by='city', optional=True),
+    Aggregation('weather_distribution', 'count', by='weather_condition', optional=True),
+    Aggregation('temperature_stats', 'summary', column='temperature', optional=True),
+]
+
+
+def _to_python(value: Any) -> Any:
+    """numpy scalar -> Python scalar supaya state bisa ditulis sebagai JSON"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _to_plain(group: Any) -> Any:
+    """Key grup -> bentuk JSON (tuple jadi list); kebalikan dari _from_plain"""
+    if isinstance(group, tuple):
+        return [_to_plain(g) for g in group]
+    return _to_python(group)
+
+
+def _from_plain(group: Any) -> Any:
+    if isinstance(group, list):
+        return tuple(_from_plain(g) for g in group)
+    return group
+
+
+def _same_state_layout(stored_kind: Optional[str], kind: str) -> bool:
+    """State tersimpan dengan kind `stored_kind` bisa di-restore untuk agregasi `kind`"""
+    return stored_kind == kind or (stored_kind in GROUP_STATS_KINDS and kind in GROUP_STATS_KINDS)
+
+
+def _nest(values: Dict[tuple, Any]) -> Dict[Any, Any]:
+    """{(a, b): v} -> {a: {b: v}} untuk report dengan beberapa kolom grup"""
+    nested: Dict[Any, Any] = {}
+    for group, value in values.items():
+        level = nested
+        for part in group[:-1]:
+            level = level.setdefault(part, {})
+        level[group[-1]] = value
+    return nested
+
+
+class AggregationEngine:
+    def __init__(self, aggregations: Iterable[Aggregation], key: Optional[str] = None):
+        """
+        Evaluasi banyak Aggregation dalam satu pass
+
+        Data dibaca sekali, chunk demi chunk; setiap chunk di-update ke state
+        semua agregasi selagi masih di cache, lalu dibuang. Agregasi dengan
+        kolom grup yang sama berbagi satu groupby per chunk. State per grup
+        adalah [count, sum, min, max] sehingga hasil chunk bisa digabung dan
+        mean dihitung di akhir sebagai sum / count.
+
+        State bisa disimpan (to_state) dan digabung dengan state run lain
+        (merge), sehingga run incremental cukup memproses data baru.
+
+        Args:
+            aggregations: List Aggregation
+            key: Kolom join (mis. user_id). Jika diisi, state disimpan per
+                 (key, grup) dan jumlah baris per key dicatat, sehingga bobot
+                 join bisa diterapkan belakangan di results(weights=...) -
+                 termasuk untuk pasangan yang sisi lainnya baru datang di run
+                 berikutnya
+        """
+        self.aggregations = list(aggregations)
+        names = [a.name for a in self.aggregations]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate aggregation names: {names}")
+        self.key = key
+        self.state: Dict[str, Dict[Any, Any]] = {a.name: {} for a in self.aggregations}
+        # Agregasi per kolom grup (summary: tanpa kolom grup); satu groupby per entry per chunk
+        self._grouping: Dict[Tuple[str, ...], List[Aggregation]] = {}
+        for aggregation in self.aggregations:
+            by = () if aggregation.kind == 'summary' else tuple(aggregation.by_columns)
+            self._grouping.setdefault(by, []).append(aggregation)
+        # Jumlah baris per key (hanya jika key diisi), dipakai sebagai bobot join untuk sisi lain
+        self.key_counts: Dict[Any, int] = {}
+        # Kolom yang pernah terlihat; report non-optional tanpa kolom tetap ditulis sebagai {}
+        self.seen_columns = set()
+        self.rows = 0
+
+    def _groupers(self, aggregation: Aggregation, chunk: pd.DataFrame):
+        """Kolom grup untuk satu agregasi; dengan key, grup berupa tuple (key, nilai)"""
+        if aggregation.kind == 'summary':
+            return [chunk[self.key]] if self.key is not None else None
+        by = [chunk[c] for c in aggregation.by_columns]
+        if self.key is not None:
+            return [chunk[self.key]] + by
+        return by[0] if len(by) == 1 else by
+
+    def _state_key(self, aggregation: Aggregation, group: Any) -> Any:
+        if aggregation.kind == 'summary' and self.key is not None:
+            return (group, None)
+        if self.key is not None and len(aggregation.by_columns) > 1:
+            # (key, a, b) dari groupby -> (key, (a, b)) supaya grup tetap satu elemen
+            return (group[0], tuple(group[1:]))
+        return group
+
+    def update(self, chunk: pd.DataFrame, weight: Optional[str] = None):
+        """
+        Tambahkan satu chunk ke state semua agregasi
+
+        Agregasi dengan kolom grup yang sama dihitung dari satu groupby: count,
+        count/sum/min/max setiap kolom nilai dan posisi baris per grup untuk
+        sketch diambil dari satu faktorisasi kolom grup per chunk.
+
+        Args:
+            chunk: DataFrame chunk
+            weight: Kolom bobot integer per baris (None = setiap baris berbobot 1).
+                    Baris dengan bobot w dihitung seolah muncul w kali, mis.
+                    multiplicity join agar hasilnya sama dengan agregasi di hasil join
+        """
+        if weight is not None and self.key is not None:
+            raise ValueError("Row weights and a join key are exclusive; pass weights to results() instead")
+        self.seen_columns.update(c for c in chunk.columns if c != weight)
+        self.rows += len(chunk)
+        if self.key is not None and self.key in chunk:
+            for value, count in chunk[self.key].value_counts(sort=False).items():
+                self.key_counts[value] = self.key_counts.get(value, 0) + int(count)
+
+        weights = chunk[weight] if weight is not None else None
+        key_columns = [self.key] if self.key is not None else []
+        for aggregations in self._grouping.values():
+            aggregations = [a for a in aggregations if all(c in chunk for c in a.columns + key_columns)]
+            if not aggregations:
+                continue
+            groupers = self._groupers(aggregations[0], chunk)
+            if groupers is None:
+                for aggregation in aggregations:
+                    self._update_total(aggregation, chunk, weights)
+            else:
+                self._update_groups(aggregations, chunk, groupers, weights)
+
+    def _update_total(self, aggregation: Aggregation, chunk: pd.DataFrame, weights: Optional[pd.Series]):
+        """Report summary tanpa key: count/sum/min/max di seluruh chunk"""
+        values = chunk[aggregation.column]
+        if weights is None:
+            count, total = values.count(), values.sum()
+        else:
+            present = values.notna() & (weights > 0)
+            values = values.where(present)
+            count, total = weights.where(present, 0).sum(), (values * weights).sum()
+        self._merge(self.state[aggregation.name], None, count, total, values.min(), values.max())
+
+    def _update_groups(self, aggregations: List[Aggregation], chunk: pd.DataFrame, groupers,
+                       weights: Optional[pd.Series]):
+        """Update semua agregasi dengan kolom grup yang sama dari satu groupby"""
+        columns: Dict[int, pd.Series] = {}
+        specs: Dict[int, List[str]] = {}
+
+        def add(values: pd.Series, *funcs: str) -> int:
+            columns[len(columns)] = values
+            specs[len(specs)] = list(funcs)
+            return len(columns) - 1
+
+        # Kolom hasil agg (posisi, fungsi) untuk count, sum, min, max setiap kolom nilai
+        stats = {}
+        for column in dict.fromkeys(a.column for a in aggregations if a.kind not in ('count',) + SKETCH_KINDS):
+            values = chunk[column]
+            if weights is None:
+                i = add(values, 'count', 'sum', 'min', 'max')
+                stats[column] = ((i, 'count'), (i, 'sum'), (i, 'min'), (i, 'max'))
+            else:
+                present = values.notna() & (weights > 0)
+                values = values.where(present)
+                i = add(values, 'min', 'max')
+                stats[column] = ((add(weights.where(present, 0), 'sum'), 'sum'),
+                                 (add(values * weights, 'sum'), 'sum'), (i, 'min'), (i, 'max'))
+        has_count = any(a.kind == 'count' for a in aggregations)
+        weight_count = (add(weights, 'sum'), 'sum') if has_count and weights is not None else None
+
+        # sort=False: urutan kemunculan pertama, dipakai sebagai tie-break seperti value_counts
+        grouped = pd.DataFrame(columns, index=chunk.index).groupby(groupers, sort=False)
+        partial = grouped.agg(specs) if specs else None
+        if has_count:
+            counts = partial[weight_count] if weight_count is not None else grouped.size()
+        indices = grouped.indices if any(a.kind in SKETCH_KINDS for a in aggregations) else None
+
+        for aggregation in aggregations:
+            state = self.state[aggregation.name]
+            if aggregation.kind == 'count':
+                for value, count in zip(counts.index, counts.to_numpy()):
+                    value = self._state_key(aggregation, value)
+                    state[value] = state.get(value, 0) + int(count)
+            elif aggregation.kind == 'percentiles':
+                self._update_digests(aggregation, chunk, indices, weights)
+            elif aggregation.kind == 'distinct':
+                self._update_sketches(aggregation, chunk, indices, weights)
+            else:
+                arrays = [partial[ref].to_numpy() for ref in stats[aggregation.column]]
+                for group, count, total, minimum, maximum in zip(partial.index, *arrays):
+                    self._merge(state, self._state_key(aggregation, group), count, total, minimum, maximum)
+
+    def _update_digests(self, aggregation: Aggregation, chunk: pd.DataFrame, indices: Dict[Any, np.ndarray],
+                        weights: Optional[pd.Series]):
+        """Nilai setiap grup ditambahkan ke TDigest grup itu (satu add vectorized per grup per chunk)"""
+        state = self.state[aggregation.name]
+        values = pd.to_numeric(chunk[aggregation.column], errors='coerce').to_numpy(dtype=np.float64)
+        row_weights = weights.to_numpy(dtype=np.float64) if weights is not None else None
+        for group, positions in indices.items():
+            group = self._state_key(aggregation, group)
+            digest = state.get(group)
+            if digest is None:
+                digest = state[group] = TDigest(aggregation.compression)
+            digest.add(values[positions], row_weights[positions] if row_weights is not None else None)
+
+    def _update_sketches(self, aggregation: Aggregation, chunk: pd.DataFrame, indices: Dict[Any, np.ndarray],
+                         weights: Optional[pd.Series]):
+        """Hash nilai `column` (sekali per nilai unik di chunk) ke HyperLogLog setiap grup"""
+        state = self.state[aggregation.name]
+        values = chunk[aggregation.column]
+        present = values.notna()
+        if weights is not None:
+            present &= weights > 0
+        present = present.to_numpy()
+        hashes = np.zeros(len(chunk), dtype=np.uint64)
+        hashes[present] = hash_values(values.to_numpy()[present])
+        for group, positions in indices.items():
+            positions = positions[present[positions]]
+            if not len(positions):
+                continue
+            group = self._state_key(aggregation, group)
+            sketch = state.get(group)
+            if sketch is None:
+                sketch = state[group] = HyperLogLog(aggregation.precision)
+            sketch.add_hashes(hashes[positions])
+
+    def _new_sketch(self, aggregation: Aggregation) -> Any:
+        if aggregation.kind == 'percentiles':
+            return TDigest(aggregation.compression)
+        return HyperLogLog(aggregation.precision)
+
+    @staticmethod
+    def _merge(state: Dict[Any, List], group: Any, count, total, minimum, maximum):
+        current = state.get(group)
+        if current is None:
+            state[group] = [int(count), total, minimum, maximum]
+        elif count:
+            current[0] += int(count)
+            current[1] += total
+            # fmin/fmax: grup yang sebelumnya hanya berisi NaN tidak menutupi nilai baru
+            current[2] = np.fmin(current[2], minimum)
+            current[3] = np.fmax(current[3], maximum)
+
+    def merge(self, other: 'AggregationEngine') -> 'AggregationEngine':
+        """
+        Gabungkan state engine lain (mis. hasil run atas data baru) ke engine ini
+
+        Count dijumlahkan, sum dijumlahkan, min/max diambil yang terkecil/terbesar;
+        hasilnya sama dengan memproses kedua data sekaligus. TDigest di-merge
+        dan HyperLogLog di-merge (sama dalam error bound sketch).
+        """
+        if [a.name for a in other.aggregations] != [a.name for a in self.aggregations] or other.key != self.key:
+            raise ValueError("Cannot merge aggregation engines with different aggregations or key")
+        for aggregation in self.aggregations:
+            state = self.state[aggregation.name]
+            for group, value in other.state[aggregation.name].items():
+                if aggregation.kind == 'count':
+                    state[group] = state.get(group, 0) + value
+                elif aggregation.kind in SKETCH_KINDS:
+                    if group not in state:
+                        state[group] = self._new_sketch(aggregation)
+                    state[group].merge(value)
+                else:
+                    self._merge(state, group, *value)
+        for value, count in other.key_counts.items():
+            self.key_counts[value] = self.key_counts.get(value, 0) + count
+        self.seen_columns |= other.seen_columns
+        self.rows += other.rows
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """State dalam bentuk JSON-serializable (key grup disimpan sebagai list supaya tipenya tetap)"""
+        def entry(value):
+            if isinstance(value, TDigest):
+                return value.to_dict()
+            if isinstance(value, HyperLogLog):
+                return base64.b64encode(value.to_bytes()).decode('ascii')
+            return [_to_python(v) for v in value] if isinstance(value, list) else _to_python(value)
+
+        return {
+            'key': self.key,
+            'rows': self.rows,
+            'seen_columns': sorted(self.seen_columns),
+            'key_counts': [[_to_python(k), n] for k, n in self.key_counts.items()],
+            'aggregations': {
+                a.name: {'kind': a.kind, 'groups': [[_to_plain(g), entry(v)] for g, v in self.state[a.name].items()]}
+                for a in self.aggregations
+            },
+        }
+
+    @classmethod
+    def from_state(cls, aggregations: Iterable[Aggregation], state: Dict[str, Any]) -> 'AggregationEngine':
+        """Build engine dari hasil to_state(); agregasi yang belum ada di state dimulai kosong"""
+        engine = cls(aggregations, key=state.get('key'))
+        engine.rows = state.get('rows', 0)
+        engine.seen_columns = set(state.get('seen_columns', []))
+        engine.key_counts = {k: n for k, n in state.get('key_counts', [])}
+        stored = state.get('aggregations', {})
+        for aggregation in engine.aggregations:
+            entries = stored.get(aggregation.name)
+            if entries is None or not _same_state_layout(entries.get('kind'), aggregation.kind):
+                continue
+            engine.state[aggregation.name] = {
+                _from_plain(g): cls._restore_entry(aggregation, v) for g, v in entries['groups']}
+        return engine
+
+    @staticmethod
+    def _restore_entry(aggregation: Aggregation, value: Any) -> Any:
+        if aggregation.kind == 'percentiles':
+            return TDigest.from_dict(value, aggregation.compression)
+        if aggregation.kind == 'distinct':
+            return HyperLogLog.from_bytes(base64.b64decode(value))
+        return value
+
+    def run(self, data, chunk_size: Optional[int] = None, weight: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Evaluasi semua agregasi atas DataFrame atau iterable of DataFrame chunks
+
+        Args:
+            data: DataFrame, atau iterable chunk DataFrame
+            chunk_size: Ukuran chunk jika data berupa DataFrame (None = satu chunk)
+            weight: Kolom bobot per baris (lihat update())
+
+        Returns:
+            Dictionary nama report -> hasil (lihat results())
+        """
+        chunks = data
+        if isinstance(data, pd.DataFrame):
+            chunk_size = chunk_size or max(len(data), 1)
+            chunks = (data.iloc[i:i + chunk_size] for i in range(0, max(len(data), 1), chunk_size))
+        for chunk in chunks:
+            self.update(chunk, weight=weight)
+        logging.info(f"Evaluated {len(self.aggregations)} aggregations over {self.rows} rows in one pass")
+        return self.results()
+
+    def _collapse(self, aggregation: Aggregation, weights: Optional[Dict[Any, int]]) -> Dict[Any, Any]:
+        """State per (key, grup) -> state per grup, setiap key dikalikan bobotnya (0 = dibuang)"""
+        state = self.state[aggregation.name]
+        if self.key is None:
+            return state
+        collapsed: Dict[Any, Any] = {}
+        for (key, group), value in state.items():
+            factor = 1 if weights is None else weights.get(key, 0)
+            if not factor:
+                continue
+            if aggregation.kind == 'count':
+                collapsed[group] = collapsed.get(group, 0) + value * factor
+            elif aggregation.kind == 'percentiles':
+                collapsed.setdefault(group, TDigest(aggregation.compression)).merge(value, factor)
+            elif aggregation.kind == 'distinct':
+                # Bobot tidak mengubah jumlah nilai unik, cukup key yang ter-join
+                collapsed.setdefault(group, HyperLogLog(aggregation.precision)).merge(value)
+            else:
+                self._merge(collapsed, group, value[0] * factor, value[1] * factor, value[2], value[3])
+        return collapsed
+
+    def result(self, aggregation: Aggregation, weights: Optional[Dict[Any, int]] = None) -> Any:
+        result = self._result(aggregation, self._collapse(aggregation, weights))
+        return _nest(result) if len(aggregation.by_columns) > 1 else result
+
+    @staticmethod
+    def _result(aggregation: Aggregation, state: Dict[Any, Any]) -> Any:
+        if aggregation.kind == 'count':
+            # Sama dengan value_counts(): urut count menurun, tie sesuai urutan kemunculan
+            return pd.Series(state, dtype='int64').sort_values(ascending=False, kind='stable').to_dict()
+        if aggregation.kind == 'distinct':
+            estimates = {group: int(round(sketch.estimate())) for group, sketch in state.items()}
+            return pd.Series(estimates, dtype='int64').sort_values(ascending=False, kind='stable').to_dict()
+        if aggregation.kind == 'percentiles':
+            return {group: {'count': int(round(digest.count)), **digest.quantiles(aggregation.quantiles)}
+                    for group, digest in sorted(state.items(), key=lambda item: item[0])}
+        if aggregation.kind == 'span':
+            return {group: {'count': int(s[0]), 'first': s[2], 'last': s[3]}
+                    for group, s in sorted(state.items(), key=lambda item: item[0])}
+        if aggregation.kind == 'summary':
+            count, total, minimum, maximum = state.get(None, [0, np.nan, np.nan, np.nan])
+            stats = {'avg': total / count if count else np.nan, 'min': minimum, 'max': maximum}
+            return {f"{stat}_{aggregation.column}": stats[stat] for stat in SUMMARY_STATS}
+
+        index = {'mean': None, 'min': 2, 'max': 3}[aggregation.kind]
+        values = {group: ((s[1] / s[0] if s[0] else np.nan) if index is None else s[index])
+                  for group, s in state.items()}
+        # Sama dengan groupby(): urut berdasarkan key grup
+        return pd.Series(values, dtype='float64' if index is None else None).sort_index().to_dict()
+
+    def results(self, weights: Optional[Dict[Any, int]] = None) -> Dict[str, Any]:
+        """
+        Hasil semua report; report optional yang kolomnya tidak pernah ada dilewati
+
+        Args:
+            weights: Hanya untuk engine dengan key: bobot per key, mis. key_counts
+                     engine sisi lain join (hasil = agregasi di hasil inner join).
+                     None = setiap baris dihitung sekali
+        """
+        results = {}
+        for aggregation in self.aggregations:
+            if not all(c in self.seen_columns for c in aggregation.columns):
+                if not aggregation.optional:
+                    results[aggregation.name] = {}
+                continue
+            results[aggregation.name] = self.result(aggregation, weights)
+        return results
+
+    def write(self, output_dir: str = '.', weights: Optional[Dict[Any, int]] = None,
+              names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Tulis setiap report ke "{output_dir}/{name}.json" (JSON indent 2)
+
+        Args:
+            weights: Sama dengan results()
+            names: Hanya report ini yang ditulis (mis. tanpa agregasi yang hanya dipakai
+                   sebagai state); None = semua
+
+        Returns:
+            List nama file yang ditulis
+        """
+        names = set(names) if names is not None else None
+        files = []
+        for name, data in self.results(weights).items():
+            if names is not None and name not in names:
+                continue
+            path = os.path.join(output_dir, f"{name}.json")
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+            files.append(path)
+        return files
+
+    def write_sketches(self, output_dir: str = '.', weights: Optional[Dict[Any, int]] = None) -> List[str]:
+        """
+        Tulis sketch HyperLogLog setiap report distinct ke "{output_dir}/{name}.hll.npz"
+
+        File ini state binary yang mergeable (lihat read_sketches): sketch dari
+        partisi atau run lain bisa digabung per grup tanpa membaca ulang data.
+
+        Args:
+            weights: Sama dengan results(); hanya key dengan bobot > 0 yang ikut
+
+        Returns:
+            List nama file yang ditulis
+        """
+        files = []
+        for aggregation in self.aggregations:
+            if aggregation.kind != 'distinct' or not all(c in self.seen_columns for c in aggregation.columns):
+                continue
+            sketches = self._collapse(aggregation, weights)
+            if len(aggregation.by_columns) > 1:
+                sketches = {'|'.join(map(str, group)): sketch for group, sketch in sketches.items()}
+            path = os.path.join(output_dir, f"{aggregation.name}.hll.npz")
+            write_sketches(path, sketches)
+            files.append(path)
+        return files
@@ -0,0 +1,200 @@
+import hashlib
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+# Precision default: m = 2^14 register, standard error ~1.04 / sqrt(m) = 0.81%
+DEFAULT_PRECISION = 14
+
+# Selama jumlah register terisi <= m / SPARSE_FRACTION, sketch disimpan sparse (index -> rank)
+SPARSE_FRACTION = 8
+
+# Header format binary: magic, versi, precision, mode
+SKETCH_MAGIC = b'HL'
+SKETCH_VERSION = 1
+_DENSE, _SPARSE = 0, 1
+
+
+def _value_bytes(value: Any) -> bytes:
+    return value.encode('utf-8') if isinstance(value, str) else str(value).encode('utf-8')
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    Hash 64-bit (blake2b) untuk array nilai; NaN/None diabaikan
+
+    Nilai di-factorize dulu sehingga setiap nilai unik hanya di-hash sekali,
+    lalu hasilnya di-broadcast ke semua baris.
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(_value_bytes(v), digest_size=8).digest(), 'little')
+                          for v in uniques), dtype=np.uint64, count=len(uniques))
+    return hashes[codes[codes >= 0]]
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """bit_length() vectorized untuk uint64 (dipecah 32-bit supaya frexp float64 tetap eksak)"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1]).astype(np.int64)
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        """
+        Sketch jumlah nilai unik (distinct count) dengan memory tetap
+
+        Setiap hash 64-bit memilih satu dari m = 2^precision register lewat
+        `precision` bit teratas; register menyimpan posisi bit 1 pertama
+        (rank) maksimum dari sisa bit. Estimasi memakai harmonic mean register
+        dengan koreksi linear counting untuk kardinalitas kecil (di bawah
+        2.5 m hasilnya praktis eksak). Standard error ~1.04 / sqrt(m).
+
+        Sketch dengan sedikit nilai disimpan sparse (dict index -> rank),
+        sehingga banyak sketch kecil (mis. per user dan halaman di state
+        incremental) tetap murah; setelah melewati m / SPARSE_FRACTION register
+        otomatis dijadikan dense (m byte).
+
+        Merge = max per register, jadi sketch dari partisi, worker atau run
+        berbeda bisa digabung tanpa kehilangan akurasi.
+
+        Args:
+            precision: Jumlah bit index register, 4..18
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers: Optional[np.ndarray] = None
+        self.sparse: Dict[int, int] = {}
+
+    def __repr__(self) -> str:
+        mode = 'dense' if self.registers is not None else f'sparse={len(self.sparse)}'
+        return f"HyperLogLog(precision={self.precision}, {mode}, estimate={self.estimate():.0f})"
+
+    def add(self, values) -> 'HyperLogLog':
+        """Tambahkan array nilai (di-hash dengan hash_values)"""
+        return self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes: np.ndarray) -> 'HyperLogLog':
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return self
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        self._update(index, rank)
+        return self
+
+    def _update(self, index: np.ndarray, rank: np.ndarray):
+        if self.registers is None:
+            if len(self.sparse) + len(index) > self.m // SPARSE_FRACTION:
+                self._densify()
+            else:
+                sparse = self.sparse
+                for i, r in zip(index.tolist(), rank.tolist()):
+                    if r > sparse.get(i, 0):
+                        sparse[i] = r
+                return
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def _densify(self):
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+        if self.sparse:
+            index = np.fromiter(self.sparse.keys(), dtype=np.int64, count=len(self.sparse))
+            self.registers[index] = np.fromiter(self.sparse.values(), dtype=np.uint8, count=len(self.sparse))
+        self.sparse = {}
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Gabungkan sketch lain (max per register); precision harus sama"""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog with precision {other.precision} into {self.precision}")
+        if other.registers is not None:
+            if self.registers is None:
+                self._densify()
+            np.maximum(self.registers, other.registers, out=self.registers)
+        elif other.sparse:
+            self._update(np.fromiter(other.sparse.keys(), dtype=np.int64, count=len(other.sparse)),
+                         np.fromiter(other.sparse.values(), dtype=np.int64, count=len(other.sparse)))
+        return self
+
+    def dense_registers(self) -> np.ndarray:
+        if self.registers is not None:
+            return self.registers
+        registers = np.zeros(self.m, dtype=np.uint8)
+        for i, r in self.sparse.items():
+            registers[i] = r
+        return registers
+
+    def estimate(self) -> float:
+        """Perkiraan jumlah nilai unik"""
+        m = self.m
+        if self.registers is None:
+            zeros = m - len(self.sparse)
+            if zeros == m:
+                return 0.0
+            # Selalu < m / SPARSE_FRACTION register terisi, jadi selalu di range linear counting
+            return m * math.log(m / zeros)
+        registers = self.registers
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(raw)
+
+    def to_bytes(self) -> bytes:
+        """
+        Bentuk binary compact: header 5 byte, lalu m byte register (dense) atau
+        uint32 little-endian per register terisi (index << 6 | rank) (sparse)
+        """
+        if self.registers is not None:
+            mode, payload = _DENSE, self.registers.tobytes()
+        else:
+            entries = np.array([(i << 6) | r for i, r in sorted(self.sparse.items())], dtype='<u4')
+            mode, payload = _SPARSE, entries.tobytes()
+        return SKETCH_MAGIC + bytes([SKETCH_VERSION, self.precision, mode]) + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        if data[:2] != SKETCH_MAGIC or data[2] != SKETCH_VERSION:
+            raise ValueError("Not a HyperLogLog sketch or unsupported version")
+        sketch = cls(data[3])
+        payload = data[5:]
+        if data[4] == _DENSE:
+            sketch.registers = np.frombuffer(payload, dtype=np.uint8).copy()
+        else:
+            entries = np.frombuffer(payload, dtype='<u4').astype(np.int64)
+            sketch.sparse = dict(zip((entries >> 6).tolist(), (entries & 0x3F).tolist()))
+        return sketch
+
+
+def write_sketches(path: str, sketches: Dict[Any, HyperLogLog]):
+    """
+    Simpan sketch per grup ke satu file .npz (compressed)
+
+    Array: 'groups' (nama grup sebagai string), 'precision' dan 'registers'
+    (uint8, satu baris m register per grup). Register kosong terkompresi
+    hampir habis, jadi file tetap kecil untuk grup dengan sedikit user.
+    """
+    precision = next(iter(sketches.values())).precision if sketches else DEFAULT_PRECISION
+    registers = np.zeros((len(sketches), 1 << precision), dtype=np.uint8)
+    for row, sketch in enumerate(sketches.values()):
+        registers[row] = sketch.dense_registers()
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, groups=np.array([str(g) for g in sketches], dtype=str),
+                            precision=np.array(precision), registers=registers)
+
+
+def read_sketches(path: str) -> Dict[str, HyperLogLog]:
+    """Load file dari write_sketches; hasil beberapa file bisa di-merge per grup"""
+    with np.load(path) as data:
+        precision = int(data['precision'])
+        sketches = {}
+        for group, registers in zip(data['groups'].tolist(), data['registers']):
+            sketch = HyperLogLog(precision)
+            sketch.registers = registers.copy()
+            sketches[group] = sketch
+        return sketches
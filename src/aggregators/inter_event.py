@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence
+from src.aggregators.aggregation import Aggregation, AggregationEngine
+from src.utils.timestamps import NAT
+
+# Statistik jeda antar event per user (dalam microseconds)
+INTER_EVENT_STATS = ('mean', 'median', 'p95', 'max')
+
+
+def _segment_quantile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    Quantile per segment dari array yang sudah terurut di dalam setiap segment
+
+    Interpolasi linear antara dua elemen terdekat, sama dengan np.quantile
+    (method='linear'), tetapi untuk semua segment sekaligus tanpa loop.
+    """
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    low_values = sorted_values[starts + lower].astype(np.float64)
+    high_values = sorted_values[starts + upper].astype(np.float64)
+    return low_values + (high_values - low_values) * (position - lower)
+
+
+def inter_event_stats(user_ids, epoch_us) -> pd.DataFrame:
+    """
+    Statistik jeda antar event per user secara vectorized
+
+    Event diurutkan sekali berdasarkan (user, timestamp), jeda dihitung dengan
+    satu np.diff dan jeda yang melewati batas user dibuang. Jeda lalu diurutkan
+    per user (lexsort) sehingga median/p95 bisa diambil langsung dari posisi
+    di setiap segment. Tidak ada callback Python per user; kompleksitas
+    O(n log n).
+
+    Args:
+        user_ids: Array user_id per event
+        epoch_us: Timestamp int64 epoch microseconds (NAT diabaikan)
+
+    Returns:
+        DataFrame index user_id (terurut), kolom 'events', 'gaps' dan INTER_EVENT_STATS
+        dalam microseconds (float). User dengan satu event punya gaps 0 dan
+        statistik 0, sama dengan time_diff yang di-fillna 0 sebelumnya.
+    """
+    epoch_us = np.asarray(epoch_us, dtype=np.int64)
+    codes, users = pd.factorize(np.asarray(user_ids))
+    valid = (codes >= 0) & (epoch_us != NAT)
+    codes, epoch_us = codes[valid].astype(np.int64), epoch_us[valid]
+
+    order = np.lexsort((epoch_us, codes))
+    codes, epoch_us = codes[order], epoch_us[order]
+    events = np.bincount(codes, minlength=len(users))
+
+    same_user = codes[1:] == codes[:-1]
+    gap_codes = codes[1:][same_user]
+    gaps = np.diff(epoch_us)[same_user]
+
+    # Urutkan jeda di dalam setiap user; gap_codes sudah terurut sehingga segment tetap berurutan
+    gaps = gaps[np.lexsort((gaps, gap_codes))]
+    gap_counts = np.bincount(gap_codes, minlength=len(users))
+    has_gaps = gap_counts > 0
+    counts = gap_counts[has_gaps]
+    starts = (np.cumsum(gap_counts) - gap_counts)[has_gaps]
+
+    stats = {name: np.zeros(len(users), dtype=np.float64) for name in INTER_EVENT_STATS}
+    if len(gaps):
+        stats['mean'][has_gaps] = np.bincount(gap_codes, weights=gaps, minlength=len(users))[has_gaps] / counts
+        stats['median'][has_gaps] = _segment_quantile(gaps, starts, counts, 0.5)
+        stats['p95'][has_gaps] = _segment_quantile(gaps, starts, counts, 0.95)
+        stats['max'][has_gaps] = gaps[starts + counts - 1]
+
+    result = pd.DataFrame({'events': events, 'gaps': gap_counts, **stats},
+                          index=pd.Index(users, name='user_id'))
+    return result[result['events'] > 0].sort_index()
+
+
+def format_inter_event_report(stats: pd.DataFrame, columns: Sequence[str] = INTER_EVENT_STATS) -> dict:
+    """Stats per user -> {user: {'gaps': n, 'mean_seconds': ..., ...}} untuk report JSON"""
+    seconds = stats[list(columns)] / 1e6
+    report = {}
+    for user, gap_count, row in zip(stats.index, stats['gaps'].tolist(), seconds.itertuples(index=False)):
+        report[user] = {'gaps': gap_count, **{f"{name}_seconds": value for name, value in zip(columns, row)}}
+    return report
+
+
+# Span timestamp activity per user (count, first, last) untuk state incremental; kolom timestamp_us
+# berisi epoch microseconds sebagai float (NaN untuk NAT, masih eksak sampai 2^53 us)
+ACTIVITY_TIME_SPAN = Aggregation('activity_time_span', 'span', column='timestamp_us', by='user_id')
+
+
+def mean_gap_from_span(engine: AggregationEngine, users=None) -> pd.Series:
+    """
+    Rata-rata jeda antar event per user dari report ACTIVITY_TIME_SPAN
+
+    Jumlah semua jeda berurutan sama dengan (timestamp terakhir - pertama),
+    sehingga mean = (last - first) / (count - 1) dan bisa dihitung dari state
+    yang mergeable tanpa menyimpan event lama. Median/p95 tidak bisa.
+
+    Args:
+        engine: AggregationEngine yang berisi ACTIVITY_TIME_SPAN
+        users: Batasi ke user ini (mis. user yang ter-join); None = semua
+
+    Returns:
+        Series user_id -> mean jeda dalam microseconds (0 untuk user dengan satu event)
+    """
+    means = {}
+    for user, span in engine.result(ACTIVITY_TIME_SPAN).items():
+        if users is None or user in users:
+            count = span['count']
+            means[user] = (span['last'] - span['first']) / (count - 1) if count > 1 else 0.0
+    return pd.Series(means, dtype='float64').sort_index()
@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.aggregators.tdigest import DEFAULT_COMPRESSION, DEFAULT_QUANTILES, TDigest
+from src.utils.timestamps import NAT, epoch_us_to_datetime64, parse_iso_timestamps
+
+# Level rollup dari yang paling halus; setiap level diturunkan dari level sebelumnya
+ROLLUP_LEVELS = {
+    'minute': 60 * 1_000_000,
+    'hour': 60 * 60 * 1_000_000,
+    'day': 24 * 60 * 60 * 1_000_000,
+}
+
+# Dimensi cell di setiap bucket
+ROLLUP_DIMENSIONS = ('endpoint', 'method', 'status_code')
+
+# Request dengan status_code >= ERROR_STATUS dihitung sebagai error (4xx dan 5xx)
+ERROR_STATUS = 400
+
+# Measure per cell (urutan kolom di file)
+ROLLUP_MEASURES = ('requests', 'errors', 'response_time_sum', 'response_time_min', 'response_time_max')
+
+
+def _code_dtype(dictionary: Sequence[Any]) -> np.dtype:
+    # Sama dengan DictionaryEncoder: int16 selama dictionary muat
+    return np.int16 if len(dictionary) <= np.iinfo(np.int16).max else np.int32
+
+
+def _sort_key(key: Tuple) -> Tuple:
+    bucket, endpoint, method, status_code = key
+    return bucket, str(endpoint), str(method), status_code
+
+
+def _merge_cell(cells: Dict[Tuple, List], key: Tuple, requests: int, errors: int, total: float,
+                minimum: float, maximum: float, digest: Optional[TDigest], owned: bool = False):
+    """Tambahkan measure ke cell; digest di-copy kecuali owned (baru dibuat oleh pemanggil)"""
+    current = cells.get(key)
+    if current is None:
+        if digest is not None and not owned:
+            digest = TDigest(digest.compression).merge(digest)
+        cells[key] = [requests, errors, total, minimum, maximum, digest]
+        return
+    current[0] += requests
+    current[1] += errors
+    current[2] += total
+    current[3] = np.fmin(current[3], minimum)
+    current[4] = np.fmax(current[4], maximum)
+    if digest is not None:
+        if current[5] is None:
+            current[5] = TDigest(digest.compression)
+        current[5].merge(digest)
+
+
+class RollupCube:
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        """
+        Rollup api_logs per bucket waktu (minute, hour, day)
+
+        State disimpan di level minute: setiap cell (bucket, endpoint, method,
+        status_code) berisi jumlah request, jumlah error, sum/min/max
+        response_time dan TDigest response_time. Level hour dan day diturunkan
+        dari level minute (count/sum dijumlahkan, min/max digabung, digest
+        di-merge), tanpa membaca data sumber lagi.
+
+        Cube mergeable (merge()) sehingga bisa dibangun per chunk/partisi atau
+        dilanjutkan dari file hasil run sebelumnya (read()).
+
+        Args:
+            compression: Compression TDigest per cell
+        """
+        self.compression = compression
+        self.cells: Dict[Tuple, List] = {}
+        self.rows = 0
+        # Checkpoint sumber yang sudah tercakup di cube (lihat write/read), None = tidak diketahui
+        self.covers: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def update(self, chunk: pd.DataFrame) -> 'RollupCube':
+        """
+        Tambahkan satu chunk api_logs (kolom timestamp, response_time dan ROLLUP_DIMENSIONS)
+
+        Baris dengan timestamp invalid atau dimensi kosong diabaikan.
+        """
+        epoch_us = parse_iso_timestamps(chunk['timestamp'].to_numpy())
+        minute = ROLLUP_LEVELS['minute']
+        status = pd.to_numeric(chunk['status_code'], errors='coerce')
+        frame = pd.DataFrame({
+            'bucket': np.where(epoch_us == NAT, NAT, epoch_us // minute * minute),
+            'endpoint': chunk['endpoint'].to_numpy(),
+            'method': chunk['method'].to_numpy(),
+            'status_code': status.to_numpy(),
+            'response_time': pd.to_numeric(chunk['response_time'], errors='coerce').to_numpy(dtype=np.float64),
+            'error': (status >= ERROR_STATUS).to_numpy(dtype=np.int64),
+        })
+        frame = frame[(frame['bucket'] != NAT) & frame['status_code'].notna()]
+        frame['status_code'] = frame['status_code'].astype(np.int64)
+        self.rows += len(frame)
+
+        groups = frame.groupby(['bucket', *ROLLUP_DIMENSIONS], sort=False)
+        partial = groups.agg(requests=('error', 'size'), errors=('error', 'sum'),
+                             total=('response_time', 'sum'), minimum=('response_time', 'min'),
+                             maximum=('response_time', 'max'))
+        values = frame['response_time'].to_numpy()
+        indices = groups.indices
+        for key, row in zip(partial.index, partial.itertuples(index=False)):
+            digest = TDigest(self.compression).add(values[indices[key]])
+            _merge_cell(self.cells, key, int(row.requests), int(row.errors), float(row.total),
+                        row.minimum, row.maximum, digest, owned=True)
+        return self
+
+    def merge(self, other: 'RollupCube') -> 'RollupCube':
+        """Gabungkan cube lain (mis. partisi lain atau data baru) ke cube ini"""
+        for key, (requests, errors, total, minimum, maximum, digest) in other.cells.items():
+            _merge_cell(self.cells, key, requests, errors, total, minimum, maximum, digest)
+        self.rows += other.rows
+        return self
+
+    def levels(self) -> Dict[str, Dict[Tuple, List]]:
+        """
+        Cell untuk setiap level di ROLLUP_LEVELS
+
+        Level pertama adalah state cube; setiap level berikutnya diturunkan
+        dari level sebelumnya dengan membulatkan bucket ke bawah.
+        """
+        names = list(ROLLUP_LEVELS)
+        levels = {names[0]: {key: self.cells[key] for key in sorted(self.cells, key=_sort_key)}}
+        for finer, coarser in zip(names, names[1:]):
+            # Urutan cell terurut, jadi hasil sum/merge digest sama untuk cube yang sama (mis. setelah read())
+            width = ROLLUP_LEVELS[coarser]
+            cells: Dict[Tuple, List] = {}
+            for (bucket, *dimensions), (requests, errors, total, minimum, maximum, digest) in levels[finer].items():
+                if digest is not None:
+                    digest.compress()
+                _merge_cell(cells, (bucket // width * width, *dimensions), requests, errors, total,
+                            minimum, maximum, digest)
+            levels[coarser] = cells
+        return levels
+
+    def write(self, path: str):
+        """
+        Tulis semua level ke satu file .npz (columnar, compressed)
+
+        Per level "{level}_*": kolom bucket (int64 epoch us), endpoint/method
+        (int16 code ke dictionary 'endpoints'/'methods'), status_code (int16),
+        ROLLUP_MEASURES, dan digest response_time dalam bentuk CSR:
+        centroid cell i ada di centroid_means/weights[offsets[i]:offsets[i + 1]].
+        File ditulis ke tmp lalu di-rename supaya pembaca tidak melihat file setengah jadi.
+        """
+        levels = self.levels()
+        endpoints = sorted({key[1] for key in self.cells}, key=str)
+        methods = sorted({key[2] for key in self.cells}, key=str)
+        endpoint_codes = {value: code for code, value in enumerate(endpoints)}
+        method_codes = {value: code for code, value in enumerate(methods)}
+
+        arrays = {
+            'endpoints': np.array([str(e) for e in endpoints], dtype=str),
+            'methods': np.array([str(m) for m in methods], dtype=str),
+            'covers': np.array(json.dumps(self.covers)),
+        }
+        for level, cells in levels.items():
+            keys = list(cells)
+            rows = list(cells.values())
+            digests = [row[5] or TDigest(self.compression) for row in rows]
+            for digest in digests:
+                digest.compress()
+            arrays.update({
+                f'{level}_bucket': np.array([key[0] for key in keys], dtype=np.int64),
+                f'{level}_endpoint': np.array([endpoint_codes[key[1]] for key in keys], dtype=_code_dtype(endpoints)),
+                f'{level}_method': np.array([method_codes[key[2]] for key in keys], dtype=_code_dtype(methods)),
+                f'{level}_status_code': np.array([key[3] for key in keys], dtype=np.int16),
+                f'{level}_requests': np.array([row[0] for row in rows], dtype=np.int64),
+                f'{level}_errors': np.array([row[1] for row in rows], dtype=np.int64),
+                f'{level}_response_time_sum': np.array([row[2] for row in rows], dtype=np.float64),
+                f'{level}_response_time_min': np.array([row[3] for row in rows], dtype=np.float64),
+                f'{level}_response_time_max': np.array([row[4] for row in rows], dtype=np.float64),
+                f'{level}_centroid_offsets': np.cumsum([0] + [len(d.means) for d in digests], dtype=np.int64),
+                f'{level}_centroid_means': np.concatenate([d.means for d in digests] or [np.empty(0)]),
+                f'{level}_centroid_weights': np.concatenate([d.weights for d in digests] or [np.empty(0)]),
+            })
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+        logging.info(f"Wrote rollup cube to {path}: " +
+                     ", ".join(f"{len(cells)} {level} cells" for level, cells in levels.items()))
+
+    @classmethod
+    def read(cls, path: str, compression: float = DEFAULT_COMPRESSION) -> 'RollupCube':
+        """Load level terhalus dari file write() sebagai state cube (untuk dilanjutkan/di-merge)"""
+        level = next(iter(ROLLUP_LEVELS))
+        cube = cls(compression)
+        with np.load(path) as data:
+            cube.covers = json.loads(data['covers'].item())
+            frame = _level_frame(data, level)
+            offsets = data[f'{level}_centroid_offsets']
+            means, weights = data[f'{level}_centroid_means'], data[f'{level}_centroid_weights']
+        for i, row in enumerate(frame.itertuples(index=False)):
+            digest = TDigest.from_centroids(means[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]],
+                                            row.response_time_min, row.response_time_max, compression)
+            key = (int(row.bucket), row.endpoint, row.method, int(row.status_code))
+            cube.cells[key] = [int(row.requests), int(row.errors), float(row.response_time_sum),
+                               row.response_time_min, row.response_time_max, digest]
+            cube.rows += int(row.requests)
+        return cube
+
+
+def _level_frame(data, level: str) -> pd.DataFrame:
+    """Kolom satu level dari file rollup sebagai DataFrame (endpoint/method sudah di-decode)"""
+    frame = pd.DataFrame({
+        'bucket': data[f'{level}_bucket'],
+        'endpoint': data['endpoints'][data[f'{level}_endpoint']] if len(data['endpoints']) else [],
+        'method': data['methods'][data[f'{level}_method']] if len(data['methods']) else [],
+        'status_code': data[f'{level}_status_code'],
+        **{measure: data[f'{level}_{measure}'] for measure in ROLLUP_MEASURES},
+    })
+    return frame
+
+
+def read_rollup(path: str, level: str = 'hour', quantiles: Optional[Sequence[float]] = DEFAULT_QUANTILES,
+                compression: float = DEFAULT_COMPRESSION) -> pd.DataFrame:
+    """
+    Baca satu level rollup untuk dashboard/query
+
+    Args:
+        path: File hasil RollupCube.write()
+        level: Salah satu ROLLUP_LEVELS
+        quantiles: Quantile response_time yang dihitung dari digest per cell (None = tidak dihitung)
+
+    Returns:
+        DataFrame: bucket (datetime64[us]), endpoint, method, status_code, ROLLUP_MEASURES
+        dan kolom "p50"/"p95"/... per quantile
+    """
+    if level not in ROLLUP_LEVELS:
+        raise ValueError(f"Unsupported rollup level: {level}. Use one of {tuple(ROLLUP_LEVELS)}")
+    with np.load(path) as data:
+        frame = _level_frame(data, level)
+        if quantiles:
+            offsets = data[f'{level}_centroid_offsets']
+            means, weights = data[f'{level}_centroid_means'], data[f'{level}_centroid_weights']
+            values = {f"p{q * 100:g}": np.full(len(frame), np.nan) for q in quantiles}
+            minimums, maximums = frame['response_time_min'].to_numpy(), frame['response_time_max'].to_numpy()
+            for i in range(len(frame)):
+                digest = TDigest.from_centroids(means[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]],
+                                                minimums[i], maximums[i], compression)
+                if not digest.count:
+                    continue
+                for name, value in digest.quantiles(quantiles).items():
+                    values[name][i] = value
+            frame = frame.assign(**values)
+    frame['bucket'] = epoch_us_to_datetime64(frame['bucket'].to_numpy())
+    return frame
@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+from src.aggregators.aggregation import Aggregation, AggregationEngine
+from src.extractors.checkpoint import CheckpointStore
+
+STATE_VERSION = 1
+
+
+class AggregateStateStore:
+    def __init__(self, path: str = '.state/aggregates.json'):
+        """
+        State agregasi (count, sum, min, max per grup) yang disimpan di disk
+
+        Run incremental memproses data baru saja, menggabungkan state-nya ke
+        state tersimpan lalu menulis ulang report dari state gabungan. Checkpoint
+        extraction ikut disimpan di file yang sama dalam satu write atomic,
+        sehingga state dan offset file sumber tidak pernah saling tertinggal.
+
+        Args:
+            path: Path ke file state JSON
+        """
+        self.path = path
+        self.data = self.load()
+
+    def load(self) -> Dict[str, Any]:
+        empty = {'version': STATE_VERSION, 'engines': {}, 'checkpoints': {}}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return empty
+        except Exception as e:
+            logging.error(f"Error loading aggregate state {self.path}: {e}")
+            return empty
+        if data.get('version') != STATE_VERSION:
+            logging.warning(f"Aggregate state {self.path} has version {data.get('version')}, starting from scratch")
+            return empty
+        return data
+
+    def engine(self, name: str, aggregations: Iterable[Aggregation],
+               key: Optional[str] = None) -> AggregationEngine:
+        """Engine berisi state tersimpan untuk `name` (kosong jika belum ada atau key berbeda)"""
+        state = self.data['engines'].get(name)
+        if state is None or state.get('key') != key:
+            return AggregationEngine(aggregations, key=key)
+        return AggregationEngine.from_state(aggregations, state)
+
+    def restore_checkpoints(self, checkpoint_store: CheckpointStore):
+        """
+        Samakan checkpoint extraction dengan state
+
+        Checkpoint di CheckpointStore di-commit setelah state disimpan. Jika run
+        sebelumnya berhenti di antaranya, checkpoint di state yang berlaku supaya
+        data yang sudah masuk state tidak dihitung dua kali.
+        """
+        for source_path, checkpoint in self.data['checkpoints'].items():
+            if checkpoint_store.checkpoints.get(source_path) != checkpoint:
+                logging.warning(f"Checkpoint for {source_path} is behind aggregate state, using the state checkpoint")
+                checkpoint_store.checkpoints[source_path] = checkpoint
+        checkpoint_store.save()
+
+    def save(self, engines: Dict[str, AggregationEngine], checkpoints: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Tulis state semua engine (dan checkpoint sumbernya) secara atomic
+
+        Args:
+            engines: Nama -> engine yang sudah di-merge dengan data baru
+            checkpoints: Path file sumber -> checkpoint extraction yang belum di-commit
+        """
+        for name, engine in engines.items():
+            self.data['engines'][name] = engine.to_state()
+        for source_path, checkpoint in (checkpoints or {}).items():
+            if checkpoint is not None:
+                self.data['checkpoints'][os.path.abspath(source_path)] = checkpoint
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,210 @@
+import math
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+# Compression (delta) default: jumlah centroid <= delta, lihat error bound di TDigest
+DEFAULT_COMPRESSION = 100
+
+# Quantile default untuk report latency
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+# Nilai baru ditampung dulu dan di-compress setelah buffer > BUFFER_FACTOR x compression
+BUFFER_FACTOR = 5
+
+
+def _scale(q: np.ndarray, compression: float) -> np.ndarray:
+    """Scale function k1: k(q) = delta / (2 pi) * asin(2q - 1); centroid rapat di ekor distribusi"""
+    return compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1.0, 1.0))
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float):
+    """
+    Gabungkan centroid terurut secara greedy selama rentangnya di skala k <= 1
+
+    Input besar (mis. satu chunk nilai mentah) lebih dulu di-bin vectorized
+    di skala 4 x compression (setiap bin <= 1/4 unit k), sehingga loop greedy
+    hanya berjalan atas beberapa ratus centroid.
+    """
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+    total = weights.sum()
+
+    if len(means) > 20 * compression:
+        cumulative = np.cumsum(weights)
+        bins = np.floor(_scale((cumulative - weights / 2) / total, 4 * compression)).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        binned_weights = np.add.reduceat(weights, starts)
+        means = np.add.reduceat(means * weights, starts) / binned_weights
+        weights = binned_weights
+
+    cumulative = np.cumsum(weights)
+    k_left = _scale((cumulative - weights) / total, compression).tolist()
+    k_right = _scale(cumulative / total, compression).tolist()
+    merged_means, merged_weights = [], []
+    current_sum = current_weight = 0.0
+    start = 0.0
+    for mean, weight, left, right in zip(means.tolist(), weights.tolist(), k_left, k_right):
+        if current_weight and right - start > 1:
+            merged_means.append(current_sum / current_weight)
+            merged_weights.append(current_weight)
+            current_sum = current_weight = 0.0
+        if not current_weight:
+            start = left
+        current_sum += mean * weight
+        current_weight += weight
+    if current_weight:
+        merged_means.append(current_sum / current_weight)
+        merged_weights.append(current_weight)
+    return np.array(merged_means, dtype=np.float64), np.array(merged_weights, dtype=np.float64)
+
+
+class TDigest:
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        """
+        Sketch quantile streaming (merging t-digest, scale function k1)
+
+        Nilai disimpan sebagai centroid (mean, weight) terurut. Centroid di
+        sekitar quantile q hanya boleh mencakup rentang 1 unit di skala
+        k(q) = delta / (2 pi) * asin(2q - 1), jadi centroid di ekor (p99) kecil
+        dan di tengah besar. Memory terbatas: setelah compress jumlah centroid
+        <= compression (ditambah buffer <= BUFFER_FACTOR x compression nilai).
+        Selama jumlah nilai <= compression, nilai disimpan apa adanya (eksak).
+
+        Error bound: satu centroid mencakup rank paling lebar
+        2 pi sqrt(q(1-q)) / delta x n, dan quantile diinterpolasi di dalamnya,
+        sehingga error rank kira-kira <= pi sqrt(q(1-q)) / delta. Dengan
+        delta = 100: ~1.6% rank di p50, ~0.7% di p95, ~0.3% di p99. Min dan max
+        selalu eksak. Bound ini perkiraan (t-digest tidak punya jaminan formal
+        seperti KLL), tetapi tetap berlaku setelah merge karena hasil merge
+        di-compress ulang dengan aturan yang sama.
+
+        Sketch mergeable: merge() dari chunk, process worker atau run lain
+        menghasilkan digest yang setara dengan memproses semua data sekaligus
+        (dalam error bound yang sama).
+
+        Args:
+            compression: delta; makin besar makin akurat dan makin besar memory
+        """
+        if compression <= 0:
+            raise ValueError(f"compression must be positive, got {compression}")
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self._buffer_means = []
+        self._buffer_weights = []
+        self._buffered = 0
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __repr__(self) -> str:
+        return f"TDigest(count={self.count:g}, centroids={len(self.means)}, compression={self.compression})"
+
+    def add(self, values, weights=None) -> 'TDigest':
+        """
+        Tambahkan array nilai (NaN diabaikan)
+
+        Args:
+            values: Array nilai
+            weights: Bobot per nilai (mis. multiplicity join); None = 1. Bobot <= 0 diabaikan
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if weights is None:
+            weights = np.ones(len(values), dtype=np.float64)
+        else:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+        keep = ~np.isnan(values) & (weights > 0)
+        if not keep.all():
+            values, weights = values[keep], weights[keep]
+        if len(values):
+            self._push(values, weights, values.min(), values.max())
+        return self
+
+    def merge(self, other: 'TDigest', factor: float = 1) -> 'TDigest':
+        """Gabungkan digest lain; factor > 1 menghitung setiap nilai di other seolah muncul factor kali"""
+        if other.count and factor > 0:
+            # Buffer other ikut di-push apa adanya; di-compress sekali di digest ini
+            for means, weights in zip([other.means] + other._buffer_means, [other.weights] + other._buffer_weights):
+                if len(means):
+                    self._push(means, weights * factor, other.min, other.max)
+        return self
+
+    def _push(self, means: np.ndarray, weights: np.ndarray, minimum: float, maximum: float):
+        self._buffer_means.append(means)
+        self._buffer_weights.append(weights)
+        self._buffered += len(means)
+        self.count += float(weights.sum())
+        self.min = min(self.min, float(minimum))
+        self.max = max(self.max, float(maximum))
+        if self._buffered > BUFFER_FACTOR * self.compression:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffered:
+            return
+        means = np.concatenate([self.means] + self._buffer_means)
+        weights = np.concatenate([self.weights] + self._buffer_weights)
+        if len(means) > self.compression:
+            self.means, self.weights = _compress(means, weights, self.compression)
+        else:
+            # Masih muat tanpa digabung: cukup diurutkan, quantile tetap eksak
+            order = np.argsort(means, kind='stable')
+            self.means, self.weights = means[order], weights[order]
+        self._buffer_means, self._buffer_weights, self._buffered = [], [], 0
+
+    def compress(self) -> 'TDigest':
+        """Compress buffer sekarang, sehingga means/weights berisi semua nilai"""
+        self._flush()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Perkiraan quantile q (0..1); NaN jika digest kosong
+
+        Setiap centroid dianggap berpusat di rank tengahnya, lalu nilai
+        diinterpolasi linear antar pusat centroid (dengan min/max di ujung).
+        Untuk centroid berisi satu nilai hasilnya sama dengan
+        np.quantile(method='linear').
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"quantile must be between 0 and 1, got {q}")
+        self._flush()
+        if not self.count:
+            return math.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q * (self.count - 1) + 0.5, ranks, values))
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """{'p50': ..., 'p95': ..., 'p99': ...} untuk report"""
+        return {f"p{q * 100:g}": self.quantile(q) for q in qs}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """State JSON-serializable (centroid setelah compress)"""
+        self._flush()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'centroids': [[m, w] for m, w in zip(self.means.tolist(), self.weights.tolist())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], compression: Optional[float] = None) -> 'TDigest':
+        centroids = np.asarray(data.get('centroids') or [], dtype=np.float64).reshape(-1, 2)
+        return cls.from_centroids(centroids[:, 0], centroids[:, 1], data.get('min'), data.get('max'),
+                                  compression or data.get('compression') or DEFAULT_COMPRESSION)
+
+    @classmethod
+    def from_centroids(cls, means: np.ndarray, weights: np.ndarray, minimum: Optional[float],
+                       maximum: Optional[float], compression: float = DEFAULT_COMPRESSION) -> 'TDigest':
+        """Build digest dari centroid yang sudah di-compress (mis. kolom CSR di file rollup)"""
+        digest = cls(compression)
+        digest.means = np.array(means, dtype=np.float64)
+        digest.weights = np.array(weights, dtype=np.float64)
+        digest.count = float(digest.weights.sum())
+        if digest.count:
+            digest.min, digest.max = float(minimum), float(maximum)
+        return digest
@@ -1,6 +1,9 @@
-from etl.extract import Extract
-from etl.transform import Transform, join_data
-from etl.load import Load
+import logging
+from src.extractors.checkpoint import CheckpointStore
+from src.extractors.extract import Extract, DEFAULT_BATCH_SIZE
+from src.extractors.pushdown import ERROR_LOGS_PREDICATE, Pushdown
+from src.transformers.transform import DEFAULT_CHUNK_SIZE, Transform, join_data
+from src.loaders.load import Load
 
 class DataPipeline:
     def __init__(self, config):
@@ -9,34 +12,52 @@ class DataPipeline:
         self.transformer = None
         self.loader = None
 
+    def _extract_config(self) -> dict:
+        return (self.config.get('extract') if self.config else None) or {}
+
     def register_source(self, source_type: str, path: str):
-        self.extractor = Extract(source_type, path)
+        extract_config = self._extract_config()
+        batch_size = extract_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        checkpoint_store = None
+        if extract_config.get('incremental'):
+            checkpoint_store = CheckpointStore(extract_config.get('checkpoint_path', '.checkpoints/extract.json'))
+        self.extractor = Extract(source_type, path, batch_size=batch_size, checkpoint_store=checkpoint_store,
+                                 pushdown=self._build_pushdown(source_type))
+
+    def _build_pushdown(self, source_type: str):
+        """Projection/predicate dari config; filter_error_logs didorong ke reader api_logs"""
+        extract_config = self._extract_config()
+        predicate = extract_config.get('predicate') or []
+        predicate = [predicate] if isinstance(predicate, str) else list(predicate)
+        transformations = (self.config.get('transformations') if self.config else None) or []
+        if source_type == 'api_logs' and any(t.get('name') == 'filter_error_logs' for t in transformations):
+            predicate.append(ERROR_LOGS_PREDICATE)
+        return Pushdown.from_config(columns=extract_config.get('columns'), predicate=' and '.join(predicate))
 
     def add_transform(self, transform_func):
         if not self.transformer:
-            self.transformer = Transform([])
+            transform_config = (self.config.get('transform') if self.config else None) or {}
+            self.transformer = Transform([], workers=transform_config.get('workers', 1),
+                                         chunk_size=transform_config.get('chunk_size', DEFAULT_CHUNK_SIZE))
         self.transformer.transforms.append(transform_func)
 
     def set_loader(self, destination: str, bucket: str, region: str):
         self.loader = Load(destination, bucket, region)
 
-    def execute(self):
-        # Extract
-        data = self.extractor.extract_data()
-
-        # Debug: Cek apakah data sudah dalam format list
-        print(f"Data after extraction: {data}")
-
-        # Pastikan data adalah list. Jika hanya satu dictionary, bungkus menjadi list
-        if isinstance(data, dict):
-            data = [data]  # Bungkus menjadi list jika data adalah dict
+    def _transform_batches(self, batches):
+        for batch in batches:
+            yield self.transformer.apply_transforms(batch) if self.transformer else batch
 
-        print(f"Data after conversion to list: {data}")  # Debug: log data setelah pembungkus
-
-        # Transform
-        transformed_data = self.transformer.apply_transforms(data) if self.transformer else data
-
-        print(f"Data after transformation: {transformed_data}")  # Debug: log data setelah transformasi
-
-        # Load
-        self.loader.load_data(transformed_data)
+    def execute(self):
+        # Extract -> Transform -> Load dijalankan per batch supaya memory tetap flat
+        batches = self.extractor.extract_batches()
+        try:
+            total = self.loader.load_batches(self._transform_batches(batches))
+        finally:
+            if self.transformer:
+                self.transformer.close()
+        # Checkpoint baru disimpan setelah load berhasil; load_batches me-raise error,
+        # sehingga data yang gagal di-load dibaca ulang di run berikutnya
+        self.extractor.commit_checkpoint()
+        logging.info(f"Pipeline processed {total} records from {self.extractor.path}")
+        return total
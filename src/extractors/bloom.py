@@ -0,0 +1,117 @@
+import hashlib
+import math
+import re
+from typing import Any, Dict, Iterable, Optional
+
+# False positive rate default untuk semi-join filter
+DEFAULT_FP_RATE = 0.01
+
+
+def _key_bytes(value: Any) -> bytes:
+    """Bentuk bytes dari key; sama dengan isi token JSON mentah tanpa quote"""
+    return value.encode('utf-8') if isinstance(value, str) else str(value).encode('utf-8')
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float = DEFAULT_FP_RATE):
+        """
+        Bloom filter dengan bit array bytearray (compact dan murah di-pickle ke worker)
+
+        Ukuran bit array dan jumlah hash dihitung dari jumlah key yang akan
+        dimasukkan dan false positive rate yang diinginkan. Tidak pernah ada
+        false negative: key yang sudah di-add selalu dianggap ada.
+
+        Args:
+            capacity: Perkiraan jumlah key unik
+            fp_rate: Target false positive rate, 0 < fp_rate < 1
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"fp_rate must be between 0 and 1, got {fp_rate}")
+        capacity = max(int(capacity), 1)
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Any], fp_rate: float = DEFAULT_FP_RATE) -> 'BloomFilter':
+        """Build filter dari kumpulan key (nilai kosong diabaikan karena tidak pernah cocok saat join)"""
+        unique = {key for key in keys if key is not None and key == key}
+        bloom = cls(len(unique), fp_rate)
+        for key in unique:
+            bloom.add(key)
+        return bloom
+
+    def _positions(self, data: bytes):
+        # Double hashing: k posisi dari dua hash 64-bit satu digest blake2b
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: Any):
+        for position in self._positions(_key_bytes(key)):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains_bytes(self, data: bytes) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(data))
+
+    def __contains__(self, key: Any) -> bool:
+        if key is None:
+            return False
+        return self.contains_bytes(_key_bytes(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def __repr__(self) -> str:
+        return (f"BloomFilter(keys={self.count}, bits={self.num_bits}, hashes={self.num_hashes}, "
+                f"fp_rate={self.fp_rate})")
+
+
+class SemiJoinPredicate:
+    def __init__(self, field: str, bloom: BloomFilter):
+        """
+        Predicate "field ada di sisi lain join" berbasis Bloom filter
+
+        Interface-nya sama dengan Predicate sehingga bisa dipakai di Pushdown:
+        prefilter() mengecek key langsung di raw line sebelum json.loads, dan
+        baris yang key-nya pasti tidak ada di filter dibuang tanpa di-decode.
+        Karena Bloom filter bisa false positive, sebagian kecil baris tanpa
+        pasangan tetap lolos dan akan dibuang oleh join itu sendiri.
+        """
+        self.field = field
+        self.bloom = bloom
+        self._raw_pattern = re.compile(
+            rb'"' + re.escape(field.encode('utf-8')) + rb'"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+    def __repr__(self) -> str:
+        return f"SemiJoinPredicate({self.field} in {self.bloom!r})"
+
+    def evaluate(self, record: Dict[str, Any]) -> bool:
+        return record.get(self.field) in self.bloom
+
+    def prefilter(self, line: bytes) -> bool:
+        """
+        Returns:
+            False hanya jika key pasti tidak ada di filter; True jika mungkin ada
+        """
+        match = self._raw_pattern.search(line)
+        if not match:
+            return False  # key tidak ada, tidak mungkin ikut inner join
+        raw = match.group(1)
+        if raw == b'null':
+            return False
+        if raw.startswith(b'"') and b'\\' not in raw:
+            return self.bloom.contains_bytes(raw[1:-1])
+        return True  # ada escape / key numerik, serahkan ke evaluate()
+
+
+def semi_join_filter(keys: Iterable[Any], field: str = 'user_id',
+                     fp_rate: Optional[float] = None) -> SemiJoinPredicate:
+    """Build SemiJoinPredicate dari key sisi lain join (mis. logs_df['user_id'])"""
+    return SemiJoinPredicate(field, BloomFilter.from_keys(keys, fp_rate or DEFAULT_FP_RATE))
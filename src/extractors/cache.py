@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Optional
+from src.extractors.columnar import ColumnarBatch
+
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    Fingerprint file sumber: path, size, mtime dan content hash
+
+    Hash dihitung dengan blake2b secara streaming, jauh lebih murah daripada
+    parsing JSON ulang.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': digest.hexdigest(),
+    }
+
+
+class SourceCache:
+    def __init__(self, cache_dir: str = '.cache/sources'):
+        """
+        Cache hasil parsing source file dalam bentuk kolom .npy
+
+        Setiap source punya folder sendiri berisi satu file .npy per kolom
+        (bisa di-load dengan mmap) dan manifest.json berisi fingerprint file
+        sumber, schema dan dictionary untuk kolom category.
+
+        Args:
+            cache_dir: Folder root untuk cache
+        """
+        self.cache_dir = cache_dir
+
+    def _entry_dir(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, key)
+
+    def _read_manifest(self, entry_dir: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(entry_dir, MANIFEST_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, manifest: Dict[str, Any], fingerprint: Dict[str, Any],
+                  schema: Optional[Dict[str, str]]) -> bool:
+        return (manifest.get('version') == CACHE_VERSION
+                and manifest.get('fingerprint') == fingerprint
+                and manifest.get('schema') == (schema or {}))
+
+    def get(self, path: str, schema: Optional[Dict[str, str]] = None,
+            fingerprint: Optional[Dict[str, Any]] = None) -> Optional[ColumnarBatch]:
+        """
+        Load source dari cache jika fingerprint masih cocok
+
+        Entry yang sudah stale langsung dihapus.
+
+        Args:
+            path: Path file sumber
+            schema: Schema kolom yang dipakai saat parsing
+            fingerprint: Fingerprint yang sudah dihitung (opsional)
+
+        Returns:
+            ColumnarBatch dengan kolom memory-mapped, atau None jika cache miss
+        """
+        entry_dir = self._entry_dir(path)
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None:
+            return None
+
+        fingerprint = fingerprint or file_fingerprint(path)
+        if not self._is_fresh(manifest, fingerprint, schema):
+            logging.info(f"Cache for {path} is stale, evicting")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        columns = {}
+        for name, meta in manifest['columns'].items():
+            array = np.load(os.path.join(entry_dir, meta['file']), mmap_mode='r')
+            if meta['kind'] == 'string' and meta.get('null_file'):
+                # Kolom string dengan nilai kosong harus di-materialize untuk mengembalikan None
+                nulls = np.load(os.path.join(entry_dir, meta['null_file']))
+                array = array.astype(object)
+                array[nulls] = None
+            columns[name] = array
+        epoch_columns = {name: np.load(os.path.join(entry_dir, file_name), mmap_mode='r')
+                         for name, file_name in manifest.get('epoch_columns', {}).items()}
+        logging.info(f"Loaded {path} from cache ({manifest['rows']} rows)")
+        return ColumnarBatch(columns, {name: list(values) for name, values in manifest['dictionaries'].items()},
+                             epoch_columns=epoch_columns)
+
+    def put(self, path: str, batch: ColumnarBatch, schema: Optional[Dict[str, str]] = None,
+            fingerprint: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Simpan hasil parsing ke cache (ditulis ke folder sementara lalu di-rename)
+
+        Returns:
+            True jika berhasil disimpan, False jika ada kolom yang tidak bisa di-cache
+        """
+        fingerprint = fingerprint or file_fingerprint(path)
+        entry_dir = self._entry_dir(path)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        try:
+            columns_meta = {}
+            for i, (name, values) in enumerate(batch.columns.items()):
+                meta = self._write_column(tmp_dir, f"col_{i}", values)
+                if meta is None:
+                    logging.warning(f"Column {name} of {path} cannot be cached, skipping cache")
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    return False
+                columns_meta[name] = meta
+
+            # Timestamp yang sudah di-parse ikut disimpan supaya tidak perlu parsing ulang
+            epoch_meta = {}
+            for i, (name, values) in enumerate(batch.epoch_columns.items()):
+                epoch_meta[name] = f"epoch_{i}.npy"
+                np.save(os.path.join(tmp_dir, epoch_meta[name]), np.asarray(values, dtype=np.int64))
+
+            manifest = {
+                'version': CACHE_VERSION,
+                'fingerprint': fingerprint,
+                'schema': schema or {},
+                'rows': len(batch),
+                'columns': columns_meta,
+                'epoch_columns': epoch_meta,
+                'dictionaries': {name: batch.dictionaries[name] for name in batch.columns
+                                 if batch.is_encoded(name)},
+                'created_at': datetime.now().isoformat(),
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            return True
+        except Exception as e:
+            logging.error(f"Error writing cache for {path}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+    def _write_column(self, entry_dir: str, stem: str, values: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Tulis satu kolom sebagai .npy, kolom object diubah ke fixed-width unicode"""
+        file_name = f"{stem}.npy"
+        if values.dtype != object:
+            np.save(os.path.join(entry_dir, file_name), np.ascontiguousarray(values))
+            return {'file': file_name, 'kind': 'array'}
+
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred in ('string', 'empty'):
+            nulls = pd.isnull(values)
+            strings = np.where(nulls, '', values).astype(str)
+            np.save(os.path.join(entry_dir, file_name), strings)
+            meta = {'file': file_name, 'kind': 'string'}
+            if nulls.any():
+                meta['null_file'] = f"{stem}_null.npy"
+                np.save(os.path.join(entry_dir, meta['null_file']), nulls)
+            return meta
+        if inferred in ('integer', 'floating', 'mixed-integer-float', 'boolean') and not pd.isnull(values).any():
+            np.save(os.path.join(entry_dir, file_name), np.array(values.tolist()))
+            return {'file': file_name, 'kind': 'array'}
+        return None
+
+    def evict_stale(self) -> int:
+        """
+        Hapus semua entry yang file sumbernya sudah berubah atau tidak ada lagi
+
+        Returns:
+            Jumlah entry yang dihapus
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        evicted = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(entry_dir):
+                continue
+            manifest = self._read_manifest(entry_dir)
+            fingerprint = (manifest or {}).get('fingerprint') or {}
+            source = fingerprint.get('path')
+            try:
+                stat = os.stat(source) if source else None
+            except OSError:
+                stat = None
+            # Cek murah (size + mtime); content hash dicek ulang saat get()
+            if (stat is None or manifest.get('version') != CACHE_VERSION
+                    or stat.st_size != fingerprint.get('size')
+                    or stat.st_mtime_ns != fingerprint.get('mtime_ns')):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                evicted += 1
+        if evicted:
+            logging.info(f"Evicted {evicted} stale cache entries from {self.cache_dir}")
+        return evicted
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Jumlah byte di awal file dan sebelum offset yang di-hash untuk deteksi rotasi/rewrite
+GUARD_BYTES = 4096
+
+
+def _hash_range(path: str, start: int, end: int) -> str:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.blake2b(f.read(max(0, end - start)), digest_size=16).hexdigest()
+
+
+def build_checkpoint(path: str, offset: int, lines: int) -> Dict[str, Any]:
+    """
+    Build checkpoint untuk satu source file
+
+    Selain offset dan jumlah baris, checkpoint menyimpan inode serta hash dari
+    byte pertama file dan byte tepat sebelum offset. Kalau file dirotasi atau
+    di-rewrite, salah satunya akan berubah.
+    """
+    stat = os.stat(path)
+    return {
+        'offset': offset,
+        'lines': lines,
+        'inode': stat.st_ino,
+        'head_hash': _hash_range(path, 0, min(GUARD_BYTES, offset)),
+        'tail_hash': _hash_range(path, max(0, offset - GUARD_BYTES), offset),
+        'updated_at': datetime.now().isoformat(),
+    }
+
+
+def is_checkpoint_valid(path: str, checkpoint: Dict[str, Any]) -> bool:
+    """
+    Cek apakah file masih merupakan kelanjutan (append-only) dari checkpoint
+
+    Returns:
+        False jika file terpotong (truncate), dirotasi atau isinya berubah
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+
+    offset = checkpoint.get('offset', 0)
+    if stat.st_size < offset:
+        logging.warning(f"{path} is smaller than checkpoint offset ({stat.st_size} < {offset}), assuming truncation")
+        return False
+    if checkpoint.get('inode') and stat.st_ino != checkpoint['inode']:
+        logging.warning(f"{path} inode changed, assuming rotation")
+        return False
+    if (_hash_range(path, 0, min(GUARD_BYTES, offset)) != checkpoint.get('head_hash')
+            or _hash_range(path, max(0, offset - GUARD_BYTES), offset) != checkpoint.get('tail_hash')):
+        logging.warning(f"{path} content before checkpoint offset changed, assuming rewrite")
+        return False
+    return True
+
+
+class CheckpointStore:
+    def __init__(self, path: str = '.checkpoints/extract.json'):
+        """
+        Penyimpanan checkpoint extraction (byte offset per source) dalam file JSON
+
+        Args:
+            path: Path ke file checkpoint
+        """
+        self.path = path
+        self.checkpoints = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.error(f"Error loading checkpoint {self.path}: {e}")
+            return {}
+
+    def get(self, source_path: str) -> Optional[Dict[str, Any]]:
+        return self.checkpoints.get(os.path.abspath(source_path))
+
+    def update(self, source_path: str, checkpoint: Dict[str, Any]):
+        self.checkpoints[os.path.abspath(source_path)] = checkpoint
+        self.save()
+
+    def reset(self, source_path: str):
+        self.checkpoints.pop(os.path.abspath(source_path), None)
+        self.save()
+
+    def save(self):
+        """Tulis checkpoint secara atomic (tmp file lalu rename)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoints, f, indent=2)
+        os.replace(tmp_path, self.path)
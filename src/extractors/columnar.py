@@ -0,0 +1,236 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from src.extractors.parallel_reader import records_to_columns
+from src.utils.timestamps import epoch_us_to_datetime64, parse_iso_timestamps
+
+# Tipe kolom per source. 'category' = integer code + shared dictionary
+COLUMN_SCHEMAS = {
+    'api_logs': {
+        'endpoint': 'category',
+        'method': 'category',
+        'status_code': 'int16',
+        'response_time': 'float32',
+    },
+    'user_activities': {
+        'action': 'category',
+        'device_type': 'category',
+        'user_agent': 'category',
+    },
+}
+
+# Nilai pengganti untuk integer yang kosong (status_code < 100 ditandai invalid oleh validator)
+MISSING_INT = -1
+
+# Code untuk nilai kosong di kolom category (sama dengan konvensi pandas)
+MISSING_CODE = -1
+
+
+class DictionaryEncoder:
+    """Dictionary string -> integer code yang di-share antar batch"""
+
+    def __init__(self):
+        self.dictionaries: Dict[str, List[Any]] = {}
+        self._lookup: Dict[str, Dict[Any, int]] = {}
+
+    @classmethod
+    def from_dictionaries(cls, dictionaries: Dict[str, List[Any]]) -> 'DictionaryEncoder':
+        """Encoder yang melanjutkan salinan dictionary yang sudah ada (code nilai lama tetap sama)"""
+        encoder = cls()
+        for column, dictionary in dictionaries.items():
+            encoder.dictionaries[column] = list(dictionary)
+            encoder._lookup[column] = {value: code for code, value in enumerate(dictionary)}
+        return encoder
+
+    def encode(self, column: str, values) -> np.ndarray:
+        """
+        Encode list nilai menjadi integer codes
+
+        Args:
+            column: Nama kolom (setiap kolom punya dictionary sendiri)
+            values: List nilai mentah
+
+        Returns:
+            Array of codes, MISSING_CODE untuk None
+        """
+        dictionary = self.dictionaries.setdefault(column, [])
+        lookup = self._lookup.setdefault(column, {})
+
+        # factorize per batch (vectorized), lalu map unique values ke code global
+        local_codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        for i, value in enumerate(uniques):
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(dictionary)
+                dictionary.append(value)
+            mapping[i] = code
+        mapping[-1] = MISSING_CODE  # local code -1 -> index terakhir
+
+        dtype = np.int16 if len(dictionary) <= np.iinfo(np.int16).max else np.int32
+        return mapping[local_codes].astype(dtype)
+
+
+class ColumnarBatch:
+    """
+    Batch data dalam bentuk kolom numpy
+
+    Kolom bertipe 'category' disimpan sebagai integer codes, dan nilai aslinya
+    ada di self.dictionaries[kolom]. Kolom lain disimpan sebagai array biasa.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Optional[Dict[str, List[Any]]] = None,
+                 epoch_columns: Optional[Dict[str, np.ndarray]] = None):
+        self.columns = columns
+        self.dictionaries = dictionaries or {}
+        # Hasil parsing timestamp (int64 epoch microseconds) per kolom, dihitung sekali saja
+        self.epoch_columns = epoch_columns or {}
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]], schema: Optional[Dict[str, str]] = None,
+                     encoder: Optional[DictionaryEncoder] = None) -> 'ColumnarBatch':
+        """
+        Build batch dari dict of lists (output parser)
+
+        Args:
+            columns: Dictionary kolom -> list nilai
+            schema: Mapping kolom -> tipe ('category', 'int16', 'float32', 'datetime64[us]', ...)
+            encoder: DictionaryEncoder yang di-share antar batch
+
+        Returns:
+            ColumnarBatch
+        """
+        schema = schema or {}
+        encoder = encoder or DictionaryEncoder()
+        arrays = {}
+        for name, values in columns.items():
+            kind = schema.get(name)
+            if kind == 'category':
+                arrays[name] = encoder.encode(name, values)
+            elif kind is not None and np.dtype(kind).kind == 'M':
+                arrays[name] = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=kind)
+            elif kind is not None:
+                arrays[name] = cls._to_numeric(name, values, np.dtype(kind))
+            else:
+                arrays[name] = np.array(values, dtype=object)
+        return cls(arrays, encoder.dictionaries)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], schema: Optional[Dict[str, str]] = None,
+                     encoder: Optional[DictionaryEncoder] = None) -> 'ColumnarBatch':
+        """Build batch dari list of dictionaries"""
+        columns, _ = records_to_columns(records)
+        return cls.from_columns(columns, schema=schema, encoder=encoder)
+
+    @classmethod
+    def from_records_like(cls, records: List[Dict[str, Any]], like: 'ColumnarBatch') -> 'ColumnarBatch':
+        """
+        Build batch dari records hasil transform per-dict atas batch `like`
+
+        Tipe kolom (category, int16/float32, datetime64) dan dictionary `like`
+        dipakai ulang, sehingga batch transform berikutnya menerima batch
+        bertipe sama. Hasil parsing timestamp ikut dibawa untuk kolom yang
+        nilainya tidak diubah transform.
+        """
+        batch = cls.from_records(records, schema=like.schema,
+                                 encoder=DictionaryEncoder.from_dictionaries(like.dictionaries))
+        if len(batch) == len(like):
+            for name, epoch in like.epoch_columns.items():
+                if name in batch.columns and np.array_equal(batch.columns[name], like.columns[name]):
+                    batch.epoch_columns[name] = epoch
+        return batch
+
+    @staticmethod
+    def _to_numeric(name: str, values, dtype: np.dtype) -> np.ndarray:
+        numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+        if dtype.kind in 'iu' and numeric.isnull().any():
+            logging.warning(f"Column {name} has {numeric.isnull().sum()} missing values, filled with {MISSING_INT}")
+            numeric = numeric.fillna(MISSING_INT)
+        return numeric.to_numpy(dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    @property
+    def schema(self) -> Dict[str, str]:
+        """Tipe kolom batch ini (format COLUMN_SCHEMAS); kolom object tidak dicantumkan"""
+        schema = {}
+        for name, values in self.columns.items():
+            if self.is_encoded(name):
+                schema[name] = 'category'
+            elif values.dtype.kind in 'iufM':
+                schema[name] = values.dtype.name
+        return schema
+
+    @property
+    def nbytes(self) -> int:
+        """Perkiraan ukuran data di memory (array object dihitung per pointer)"""
+        return sum(array.nbytes for array in self.columns.values())
+
+    def epoch_us(self, name: str = 'timestamp') -> np.ndarray:
+        """
+        Kolom timestamp sebagai int64 epoch microseconds
+
+        Parsing dilakukan sekali lalu disimpan di batch, sehingga stage berikutnya
+        (validation, transform, agregasi) tidak perlu parsing ulang.
+        """
+        if name not in self.epoch_columns:
+            self.epoch_columns[name] = parse_iso_timestamps(self.columns[name])
+        return self.epoch_columns[name]
+
+    def set_column(self, name: str, values: np.ndarray, dictionary: Optional[List[Any]] = None):
+        """
+        Tambah/ganti kolom; jika dictionary diisi, values dianggap integer codes
+
+        Hasil parsing timestamp untuk kolom lama ikut dibuang.
+        """
+        self.columns[name] = values
+        self.epoch_columns.pop(name, None)
+        if dictionary is not None:
+            self.dictionaries[name] = dictionary
+
+    def is_encoded(self, name: str) -> bool:
+        return name in self.dictionaries and self.columns[name].dtype.kind == 'i'
+
+    def decode(self, name: str) -> np.ndarray:
+        """Kembalikan nilai asli kolom (decode jika kolom category)"""
+        values = self.columns[name]
+        if not self.is_encoded(name):
+            return values
+        dictionary = np.array(self.dictionaries[name] + [None], dtype=object)
+        return dictionary[values]  # MISSING_CODE (-1) -> None
+
+    def value_counts(self, name: str) -> Dict[Any, int]:
+        """Hitung frekuensi nilai, langsung di atas codes untuk kolom category"""
+        values = self.columns[name]
+        if self.is_encoded(name):
+            counts = np.bincount(values[values != MISSING_CODE], minlength=len(self.dictionaries[name]))
+            return {self.dictionaries[name][code]: int(count) for code, count in enumerate(counts) if count}
+        return pd.Series(values).value_counts().to_dict()
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Convert ke list of dictionaries (kolom category di-decode, numpy scalar jadi Python)"""
+        names = list(self.columns)
+        values = [self.decode(name).tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def to_dataframe(self, decode: bool = False, parse_dates: bool = False) -> pd.DataFrame:
+        """
+        Convert ke DataFrame
+
+        Args:
+            decode: True untuk kolom string biasa, False untuk pd.Categorical (hemat memory)
+            parse_dates: True untuk mengganti kolom timestamp yang sudah di-parse
+                         dengan datetime64[us]
+        """
+        data = {}
+        for name, values in self.columns.items():
+            if parse_dates and name in self.epoch_columns:
+                data[name] = epoch_us_to_datetime64(self.epoch_columns[name])
+            elif self.is_encoded(name):
+                data[name] = (self.decode(name) if decode else
+                              pd.Categorical.from_codes(values, categories=self.dictionaries[name]))
+            else:
+                data[name] = values
+        return pd.DataFrame(data)
@@ -1,20 +1,239 @@
 import json
 import logging
-from typing import List, Dict
+import os
+import pandas as pd
+from typing import Any, List, Dict, Iterator, Optional, Tuple
+from src.extractors.cache import SourceCache, file_fingerprint
+from src.extractors.checkpoint import CheckpointStore, build_checkpoint, is_checkpoint_valid
+from src.extractors.columnar import COLUMN_SCHEMAS, ColumnarBatch, DictionaryEncoder
+from src.extractors.parallel_reader import count_lines, read_jsonl_parallel, records_to_columns
+from src.extractors.pushdown import Pushdown
+
+# Jumlah record per batch default untuk mode streaming
+DEFAULT_BATCH_SIZE = 10000
+
+# Ukuran blok saat mencari newline terakhir dari belakang file
+TAIL_SCAN_BYTES = 64 * 1024
 
 class Extract:
-    def __init__(self, source_type: str, path: str):
+    def __init__(self, source_type: str, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 checkpoint_store: Optional[CheckpointStore] = None, pushdown: Optional[Pushdown] = None):
+        """
+        Args:
+            source_type: Tipe source ("api_logs" atau "user_activities")
+            path: Path ke file JSONL
+            batch_size: Jumlah record per batch untuk mode streaming
+            checkpoint_store: Jika diisi, extraction berjalan incremental dan hanya
+                              membaca data yang di-append sejak checkpoint terakhir
+            pushdown: Projection kolom dan predicate yang diterapkan saat membaca,
+                      sebelum record di-decode penuh
+        """
         self.source_type = source_type
         self.path = path
-    
+        self.batch_size = batch_size
+        self.checkpoint_store = checkpoint_store
+        self.pending_checkpoint = None
+        # Byte offset awal extraction terakhir (> 0 jika incremental melanjutkan checkpoint)
+        self.read_start = 0
+        self.pushdown = pushdown
+        # Jumlah baris yang dibuang pushdown (predicate/semi-join) pada extraction terakhir
+        self.pruned_rows = 0
+
+    @property
+    def incremental(self) -> bool:
+        return self.checkpoint_store is not None
+
+    def _last_newline_end(self, start: int, size: int) -> int:
+        """Offset setelah newline terakhir di [start, size), atau start jika tidak ada"""
+        with open(self.path, 'rb') as f:
+            pos = size
+            while pos > start:
+                block_start = max(start, pos - TAIL_SCAN_BYTES)
+                f.seek(block_start)
+                index = f.read(pos - block_start).rfind(b'\n')
+                if index != -1:
+                    return block_start + index + 1
+                pos = block_start
+        return start
+
+    def _resolve_range(self) -> Tuple[int, int, int]:
+        """
+        Tentukan byte range yang perlu dibaca
+
+        Returns:
+            (start, end, lines) - lines adalah jumlah baris yang sudah diproses sebelum start
+        """
+        size = os.path.getsize(self.path)
+        self.read_start = 0
+        if not self.incremental:
+            return 0, size, 0
+
+        start, lines = 0, 0
+        checkpoint = self.checkpoint_store.get(self.path)
+        if checkpoint and is_checkpoint_valid(self.path, checkpoint):
+            start, lines = checkpoint['offset'], checkpoint['lines']
+        elif checkpoint:
+            logging.warning(f"Checkpoint for {self.path} is no longer valid, falling back to full read")
+
+        # Baris terakhir yang belum diakhiri newline mungkin masih ditulis, tunggu run berikutnya
+        end = self._last_newline_end(start, size)
+        self.read_start = start
+        logging.info(f"Incremental extraction of {self.path}: bytes {start}-{end}")
+        return start, end, lines
+
+    def _set_pending_checkpoint(self, offset: int, lines: int):
+        if self.incremental:
+            self.pending_checkpoint = build_checkpoint(self.path, offset, lines)
+
+    def commit_checkpoint(self):
+        """
+        Simpan checkpoint dari extraction terakhir
+
+        Dipanggil setelah data berhasil di-load, supaya data yang gagal diproses
+        akan dibaca ulang di run berikutnya.
+        """
+        if self.incremental and self.pending_checkpoint is not None:
+            self.checkpoint_store.update(self.path, self.pending_checkpoint)
+            self.pending_checkpoint = None
+
     def extract_data(self) -> List[Dict]:
         data = []
+        for batch in self.extract_batches():
+            data.extend(batch)
+        return data  # Mengembalikan data dalam bentuk list of dictionaries
+
+    def extract_batches(self, batch_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Baca file JSONL secara streaming dan yield batch berukuran tetap
+
+        Args:
+            batch_size: Jumlah record per batch (default: self.batch_size)
+
+        Yields:
+            List of dictionaries dengan panjang maksimal batch_size
+        """
+        batch_size = batch_size or self.batch_size
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+        start, end, lines = self._resolve_range()
+        offset = start
+        parse = self.pushdown.apply if self.pushdown else json.loads
+        batch = []
+        self.pruned_rows = 0
         try:
-            with open(self.path, 'r') as file:
+            with open(self.path, 'rb') as file:
+                file.seek(start)
                 for line in file:
-                    record = json.loads(line.strip())  # Mengubah setiap baris JSON menjadi dictionary
-                    data.append(record)  # Pastikan data adalah list of dictionaries
-                    print(f"Extracted record: {record}")  # Debugging: log data yang diambil
+                    if offset >= end:
+                        break
+                    stripped = line.strip()
+                    if stripped:
+                        record = parse(stripped)  # Mengubah setiap baris JSON menjadi dictionary
+                        if record is not None:
+                            batch.append(record)
+                        else:
+                            self.pruned_rows += 1
+                    offset += len(line)
+                    lines += 1
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
         except Exception as e:
             logging.error(f"Error extracting data from {self.path}: {e}")
-        return data  # Mengembalikan data dalam bentuk list of dictionaries
+
+        self._set_pending_checkpoint(offset, lines)
+
+        # Sisa record yang belum memenuhi satu batch penuh
+        if batch:
+            yield batch
+
+    def extract_columns(self, workers: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Parse seluruh file secara paralel (lihat read_jsonl_parallel)
+
+        Args:
+            workers: Jumlah worker process (default: semua core)
+
+        Returns:
+            Dictionary kolom -> list nilai
+        """
+        start, end, lines = self._resolve_range()
+        columns = read_jsonl_parallel(self.path, workers=workers, start=start, end=end, pushdown=self.pushdown)
+        if self.pushdown or self.incremental:
+            range_lines = count_lines(self.path, start, end)
+            rows = len(next(iter(columns.values()), []))
+            self.pruned_rows = max(range_lines - rows, 0) if self.pushdown else 0
+            self._set_pending_checkpoint(end, lines + range_lines)
+        return columns
+
+    def extract_dataframe(self, workers: Optional[int] = None) -> pd.DataFrame:
+        """Parse file secara paralel langsung menjadi DataFrame"""
+        return pd.DataFrame(self.extract_columns(workers=workers))
+
+    def extract_columnar_batches(self, batch_size: Optional[int] = None,
+                                 encoder: Optional[DictionaryEncoder] = None) -> Iterator[ColumnarBatch]:
+        """
+        Streaming extraction dalam bentuk ColumnarBatch
+
+        Kolom low-cardinality di-encode menjadi integer codes dengan dictionary
+        yang di-share antar batch (lihat COLUMN_SCHEMAS).
+
+        Args:
+            batch_size: Jumlah record per batch
+            encoder: DictionaryEncoder yang dipakai bersama (default: baru)
+
+        Yields:
+            ColumnarBatch per batch
+        """
+        encoder = encoder or DictionaryEncoder()
+        schema = COLUMN_SCHEMAS.get(self.source_type)
+        for batch in self.extract_batches(batch_size):
+            columns, _ = records_to_columns(batch)
+            yield ColumnarBatch.from_columns(columns, schema=schema, encoder=encoder)
+
+    def extract_columnar_range(self, start: int, end: int, workers: Optional[int] = None,
+                               schema: Optional[Dict[str, str]] = None) -> ColumnarBatch:
+        """
+        Parse byte range [start, end) file menjadi satu ColumnarBatch, tanpa checkpoint dan cache
+
+        Dipakai untuk membangun ulang data turunan (mis. rollup) dari bagian file
+        yang sudah tercakup checkpoint. start dan end harus di awal baris.
+        """
+        schema = schema if schema is not None else COLUMN_SCHEMAS.get(self.source_type)
+        columns = read_jsonl_parallel(self.path, workers=workers, start=start, end=end, pushdown=self.pushdown)
+        batch = ColumnarBatch.from_columns(columns, schema=schema)
+        if 'timestamp' in batch.columns:
+            batch.epoch_us('timestamp')
+        return batch
+
+    def extract_columnar(self, workers: Optional[int] = None, cache: Optional[SourceCache] = None,
+                         schema: Optional[Dict[str, str]] = None) -> ColumnarBatch:
+        """
+        Parse seluruh file secara paralel menjadi satu ColumnarBatch
+
+        Args:
+            workers: Jumlah worker process untuk parsing
+            cache: SourceCache opsional; jika file belum berubah, kolom di-load
+                   dari cache tanpa parsing JSON sama sekali
+            schema: Override schema kolom (default: COLUMN_SCHEMAS[source_type])
+
+        Returns:
+            ColumnarBatch
+        """
+        schema = schema if schema is not None else COLUMN_SCHEMAS.get(self.source_type)
+        # Cache hanya berlaku untuk full read tanpa filter
+        cache = None if self.incremental or self.pushdown else cache
+        fingerprint = None
+        if cache is not None:
+            fingerprint = file_fingerprint(self.path)
+            cached = cache.get(self.path, schema=schema, fingerprint=fingerprint)
+            if cached is not None:
+                return cached
+
+        batch = ColumnarBatch.from_columns(self.extract_columns(workers=workers), schema=schema)
+        if 'timestamp' in batch.columns:
+            batch.epoch_us('timestamp')
+        if cache is not None:
+            cache.put(self.path, batch, schema=schema, fingerprint=fingerprint)
+        return batch
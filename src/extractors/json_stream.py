@@ -0,0 +1,152 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+# Ukuran potongan teks yang dibaca per read() saat parsing JSON array
+READ_SIZE = 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+_WHITESPACE_RUN = re.compile(r'[ \t\n\r]*')
+_SEPARATOR = re.compile(r'[ \t\n\r]*,[ \t\n\r]*')
+
+
+def iter_json_array(f: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Parse JSON array top-level (mis. output_data.json dari DataFrame.to_json) elemen demi elemen
+
+    File dibaca per potongan `read_size`; setiap elemen di-decode oleh scanner
+    C json (scan_once) langsung dari buffer, lalu buffer dipangkas saat
+    potongan berikutnya dibaca. Memory yang dipakai hanya satu potongan plus
+    satu elemen, berapa pun jumlah elemennya.
+
+    Jalur cepat hanya satu regex pemisah dan satu scan_once per elemen; kasus
+    di batas potongan (elemen terpotong, whitespace/pemisah di potongan
+    berikutnya) dan input invalid ditangani jalur lambat.
+
+    Args:
+        f: File object (text mode)
+        read_size: Jumlah karakter per read()
+
+    Yields:
+        Elemen array, satu per satu
+    """
+    scan = json.JSONDecoder().scan_once
+    match_separator, match_whitespace = _SEPARATOR.match, _WHITESPACE_RUN.match
+    buffer, pos, eof = '', 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = match_whitespace(buffer, pos).end()
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    need_separator = False
+    while True:
+        # Jalur cepat: pemisah + elemen utuh di dalam buffer
+        separator = match_separator(buffer, pos) if need_separator else match_whitespace(buffer, pos)
+        if separator is not None:
+            try:
+                value, end = scan(buffer, separator.end())
+                # Angka di ujung buffer mungkin terpotong (mis. "1." dari "1.5");
+                # elemen baru dipercaya jika diikuti pemisah atau file sudah habis
+                if end < len(buffer) and buffer[end] in _DELIMITERS:
+                    pos, need_separator = end, True
+                    yield value
+                    continue
+            except (StopIteration, json.JSONDecodeError):
+                pass
+
+        # Jalur lambat: baca potongan berikutnya seperlunya dan validasi struktur array
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == ']':
+            return
+        if need_separator:
+            if buffer[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}")
+            pos += 1
+            skip_whitespace()
+        while True:
+            try:
+                value, end = scan(buffer, pos)
+                if eof or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                    break
+            except StopIteration:
+                if eof:
+                    raise json.JSONDecodeError("Expecting value", buffer, pos) from None
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        pos, need_separator = end, True
+        yield value
+
+
+def iter_ndjson(f: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Parse NDJSON / JSONL (baris kosong dilewati)
+
+    Baris dibaca per batch ~read_size, lalu setiap baris di-decode sendiri
+    oleh scanner C json (scan_once) tanpa overhead json.loads per baris. Sisa
+    baris setelah value harus whitespace, jadi value yang terpotong ke baris
+    berikutnya atau dua value dalam satu baris ditolak. Baris yang tidak lolos
+    jalur cepat di-decode ulang dengan json.loads untuk pesan error-nya.
+    """
+    scan = json.JSONDecoder().scan_once
+    while True:
+        batch = f.readlines(read_size)
+        if not batch:
+            return
+        for line in batch:
+            try:
+                value, end = scan(line, 0)
+                if end == len(line) or not line[end:].strip(_WHITESPACE):
+                    yield value
+                    continue
+            except (StopIteration, json.JSONDecodeError):
+                pass
+            # Whitespace di awal baris, baris kosong, atau baris invalid
+            if line.strip(_WHITESPACE):
+                yield json.loads(line)
+
+
+def iter_json_records(path: str, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Iterasi record dari file JSON array atau NDJSON secara streaming
+
+    Format dideteksi dari karakter pertama yang bukan whitespace: '[' berarti
+    JSON array, selain itu dianggap NDJSON (satu object per baris).
+
+    Args:
+        path: Path file
+        read_size: Ukuran potongan untuk parser JSON array
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = ''
+        while True:
+            char = f.read(1)
+            if not char or char not in _WHITESPACE:
+                first = char
+                break
+        f.seek(0)
+        if first == '[':
+            yield from iter_json_array(f, read_size)
+        else:
+            yield from iter_ndjson(f, read_size)
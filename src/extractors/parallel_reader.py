@@ -0,0 +1,135 @@
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from src.extractors.pushdown import Pushdown
+
+# File yang lebih kecil dari ini dibaca serial, overhead process pool tidak sebanding
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+
+# Jumlah shard per worker supaya beban tetap seimbang jika panjang baris bervariasi
+SHARDS_PER_WORKER = 4
+
+
+def compute_byte_ranges(path: str, num_shards: int, start: int = 0,
+                        end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Bagi file menjadi byte range yang selalu berakhir di batas newline
+
+    Args:
+        path: Path ke file JSONL
+        num_shards: Jumlah range yang diinginkan (bisa lebih sedikit untuk file kecil)
+        start: Byte offset awal (harus di awal baris)
+        end: Byte offset akhir (default: ukuran file)
+
+    Returns:
+        List of (start, end) byte offsets, berurutan dan tidak overlap
+    """
+    end = os.path.getsize(path) if end is None else end
+    if end <= start:
+        return []
+
+    boundaries = [start]
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        step = max(1, (end - start) // max(1, num_shards))
+        for i in range(1, num_shards):
+            pos = mm.find(b'\n', max(start + i * step, boundaries[-1]), end)
+            if pos == -1 or pos + 1 >= end:
+                break
+            if pos + 1 > boundaries[-1]:
+                boundaries.append(pos + 1)
+    boundaries.append(end)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def count_lines(path: str, start: int = 0, end: Optional[int] = None) -> int:
+    """Hitung jumlah newline di dalam byte range"""
+    end = os.path.getsize(path) if end is None else end
+    if end <= start:
+        return 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[start:end].count(b'\n')
+
+
+def records_to_columns(records) -> Tuple[Dict[str, List[Any]], int]:
+    """Ubah iterable of dict menjadi dict of lists, key yang hilang diisi None"""
+    columns: Dict[str, List[Any]] = {}
+    count = 0
+    for record in records:
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * count
+            column.append(value)
+        count += 1
+        if len(record) < len(columns):
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(None)
+    return columns, count
+
+
+def _parse_range(args: Tuple[str, int, int, Optional[Pushdown]]) -> Tuple[Dict[str, List[Any]], int]:
+    """Worker: parse satu byte range dan kembalikan hasilnya dalam bentuk kolom"""
+    path, start, end, pushdown = args
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunk = mm[start:end]
+    lines = (line for line in chunk.splitlines() if line.strip())
+    if pushdown is None:
+        records = (json.loads(line) for line in lines)
+    else:
+        records = (record for record in map(pushdown.apply, lines) if record is not None)
+    # Kolom dikirim balik ke parent, jauh lebih murah di-pickle daripada list of dicts
+    return records_to_columns(records)
+
+
+def _concat_columns(parts: List[Tuple[Dict[str, List[Any]], int]]) -> Dict[str, List[Any]]:
+    """Gabungkan hasil tiap shard sesuai urutan input"""
+    keys: List[str] = []
+    for columns, _ in parts:
+        for key in columns:
+            if key not in keys:
+                keys.append(key)
+
+    result: Dict[str, List[Any]] = {key: [] for key in keys}
+    for columns, count in parts:
+        for key in keys:
+            result[key].extend(columns.get(key, [None] * count))
+    return result
+
+
+def read_jsonl_parallel(path: str, workers: Optional[int] = None,
+                        shards_per_worker: int = SHARDS_PER_WORKER,
+                        start: int = 0, end: Optional[int] = None,
+                        pushdown: Optional[Pushdown] = None) -> Dict[str, List[Any]]:
+    """
+    Parse file JSONL secara paralel dengan membagi file per byte range
+
+    File di-mmap, dipotong di batas newline, lalu setiap range di-parse di
+    process pool. Hasilnya disambung kembali sesuai urutan baris di file.
+
+    Args:
+        path: Path ke file JSONL
+        workers: Jumlah worker process (default: os.cpu_count())
+        shards_per_worker: Jumlah range per worker
+        start: Byte offset awal (untuk incremental read)
+        end: Byte offset akhir (default: ukuran file)
+        pushdown: Projection/predicate yang diterapkan sebelum decode penuh
+
+    Returns:
+        Dictionary kolom -> list nilai, urut sesuai baris input
+    """
+    workers = workers or os.cpu_count() or 1
+    end = os.path.getsize(path) if end is None else end
+
+    if workers == 1 or end - start < MIN_PARALLEL_BYTES:
+        ranges = [(start, end)] if end > start else []
+        return _concat_columns([_parse_range((path, lo, hi, pushdown)) for lo, hi in ranges])
+
+    ranges = compute_byte_ranges(path, workers * shards_per_worker, start=start, end=end)
+    logging.info(f"Parsing {path} in {len(ranges)} ranges with {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_parse_range, [(path, lo, hi, pushdown) for lo, hi in ranges]))
+    return _concat_columns(parts)
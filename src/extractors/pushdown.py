@@ -0,0 +1,150 @@
+import json
+import operator
+import re
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# Predicate untuk transformasi filter_error_logs di config.yaml
+ERROR_LOGS_PREDICATE = 'status_code >= 400'
+
+OPERATORS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '!=': operator.ne,
+    '==': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+_EXPRESSION = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|==|>|<)\s*(.+?)\s*$')
+
+
+def _parse_literal(text: str) -> Any:
+    """Literal di ekspresi predicate: angka, string dengan quote, atau string biasa (mis. timestamp ISO)"""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        return text[1:-1]
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+class Predicate:
+    def __init__(self, field: str, op: str, value: Any):
+        """
+        Predicate sederhana "field op value", mis. status_code >= 400
+
+        Selain evaluasi di record yang sudah di-decode, predicate bisa mengecek
+        baris JSON mentah dengan regex (prefilter) sehingga baris yang pasti
+        tidak lolos tidak perlu di-decode sama sekali.
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {op}")
+        self.field = field
+        self.op = op
+        self.value = value
+        self._compare = OPERATORS[op]
+        # Nilai field di raw line: string JSON atau token sampai , } atau whitespace
+        self._raw_pattern = re.compile(
+            rb'"' + re.escape(field.encode('utf-8')) + rb'"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+    @classmethod
+    def parse(cls, expression: str) -> 'Predicate':
+        match = _EXPRESSION.match(expression)
+        if not match:
+            raise ValueError(f"Invalid predicate expression: {expression!r}")
+        field, op, literal = match.groups()
+        return cls(field, op, _parse_literal(literal))
+
+    def __repr__(self) -> str:
+        return f"Predicate({self.field} {self.op} {self.value!r})"
+
+    def _matches(self, value: Any) -> bool:
+        if value is None:
+            return False
+        try:
+            return self._compare(value, self.value)
+        except TypeError:
+            return False
+
+    def evaluate(self, record: Dict[str, Any]) -> bool:
+        return self._matches(record.get(self.field))
+
+    def prefilter(self, line: bytes) -> bool:
+        """
+        Cek murah di raw line tanpa json.loads
+
+        Returns:
+            False hanya jika baris pasti tidak lolos; True jika lolos atau belum bisa dipastikan
+        """
+        raw_values = self._raw_pattern.findall(line)
+        if not raw_values:
+            return False  # field tidak ada, evaluate() juga akan False
+
+        for raw in raw_values:
+            if raw.startswith(b'"'):
+                if b'\\' in raw or not isinstance(self.value, str):
+                    return True  # ada escape / beda tipe, serahkan ke evaluate()
+                value = raw[1:-1].decode('utf-8')
+            elif raw == b'null':
+                continue
+            elif isinstance(self.value, (int, float)) and not isinstance(self.value, bool):
+                try:
+                    value = float(raw)
+                except ValueError:
+                    return True
+            else:
+                return True
+            if self._matches(value):
+                return True
+        return False
+
+
+class Pushdown:
+    def __init__(self, columns: Optional[List[str]] = None,
+                 predicates: Optional[Iterable[Union[str, Predicate]]] = None):
+        """
+        Projection dan predicate yang didorong ke reader JSONL
+
+        Args:
+            columns: Kolom yang di-materialize (None = semua kolom)
+            predicates: List predicate (string, Predicate, atau objek lain dengan
+                        prefilter()/evaluate() seperti SemiJoinPredicate), digabung dengan AND
+        """
+        self.columns = list(columns) if columns else None
+        self.predicates = [Predicate.parse(p) if isinstance(p, str) else p for p in (predicates or [])]
+
+    @classmethod
+    def from_config(cls, columns=None, predicate=None) -> Optional['Pushdown']:
+        """
+        Build dari config; predicate boleh string "a >= 1 and b < 2" atau list
+
+        Returns:
+            None jika tidak ada projection maupun predicate
+        """
+        if isinstance(predicate, str):
+            predicate = [part for part in re.split(r'\s+and\s+', predicate, flags=re.IGNORECASE) if part.strip()]
+        if not columns and not predicate:
+            return None
+        return cls(columns=columns, predicates=predicate)
+
+    def apply(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Prefilter raw line, decode, evaluate predicate lalu project kolom
+
+        Returns:
+            Record hasil projection, atau None jika baris dibuang
+        """
+        for predicate in self.predicates:
+            if not predicate.prefilter(line):
+                return None
+
+        record = json.loads(line)
+        for predicate in self.predicates:
+            if not predicate.evaluate(record):
+                return None
+
+        if self.columns is None:
+            return record
+        return {column: record[column] for column in self.columns if column in record}
@@ -2,6 +2,7 @@ import boto3  # type: ignore
 import json
 import logging
 import os
+import tempfile
 
 class Load:
     def __init__(self, destination: str, bucket: str, region: str):
@@ -11,7 +12,16 @@ class Load:
         # Pastikan menggunakan region yang benar
         self.s3_client = boto3.client('s3', region_name=self.region)
     
-    def load_data(self, data, s3_key=None, local_file_name=None):
+    def load_data(self, data, s3_key=None, local_file_name=None) -> bool:
+        """
+        Simpan data ke lokal dan/atau upload ke S3
+
+        Error dicatat ke log (tidak di-raise); caller memakai nilai return
+        untuk memutuskan apakah checkpoint boleh di-commit.
+
+        Returns:
+            True jika semua tujuan berhasil ditulis
+        """
         try:
             data_json = json.dumps(data)
             # Gunakan nama file custom jika diberikan
@@ -37,6 +47,75 @@ class Load:
                 except Exception as s3_error:
                     print(f"Error uploading to S3: {s3_error}")
                     logging.error(f"Error uploading to S3: {s3_error}")
+                    return False
+            return True
         except Exception as e:
             print(f"General error in load_data: {e}")
             logging.error(f"Error loading data: {e}")
+            return False
+
+    def load_batches(self, batches, s3_key=None, local_file_name=None) -> int:
+        """
+        Load data batch demi batch tanpa menampung seluruh dataset di memory
+
+        Record ditulis secara streaming sebagai JSON array ke file lokal, lalu
+        file tersebut di-upload ke S3 (multipart oleh boto3) jika diminta.
+
+        Args:
+            batches: Iterable berisi list of dictionaries
+            s3_key: Key tujuan di S3
+            local_file_name: Nama file lokal (default: output_data.json)
+
+        Returns:
+            Jumlah record yang ditulis
+
+        Raises:
+            Exception: Error menulis file atau upload ke S3 di-log lalu di-raise ulang,
+                supaya caller tidak meng-commit checkpoint untuk data yang gagal di-load
+        """
+        file_name = local_file_name if local_file_name else 'output_data.json'
+        s3_file_name = s3_key if s3_key else file_name
+        keep_local = self.destination in ['local', 'both']
+        total = 0
+
+        # Jika hanya upload ke S3, tulis dulu ke file sementara
+        if keep_local:
+            target = file_name
+        else:
+            fd, target = tempfile.mkstemp(suffix='.json')
+            os.close(fd)
+
+        try:
+            with open(target, 'w') as f:
+                f.write('[')
+                for batch in batches:
+                    for record in batch:
+                        if total:
+                            f.write(', ')
+                        f.write(json.dumps(record))
+                        total += 1
+                f.write(']')
+            if keep_local:
+                print(f"{total} records saved locally as {file_name}")
+
+            if self.destination in ['s3', 'both']:
+                try:
+                    self.s3_client.upload_file(
+                        target,
+                        self.bucket,
+                        s3_file_name,
+                        ExtraArgs={'ContentType': 'application/json'}
+                    )
+                    print(f"Data loaded to s3://{self.bucket}/{s3_file_name} in region {self.region}")
+                except Exception as s3_error:
+                    print(f"Error uploading to S3: {s3_error}")
+                    logging.error(f"Error uploading to S3: {s3_error}")
+                    raise
+        except Exception as e:
+            print(f"General error in load_batches: {e}")
+            logging.error(f"Error loading data: {e}")
+            raise
+        finally:
+            if not keep_local and os.path.exists(target):
+                os.remove(target)
+        return total
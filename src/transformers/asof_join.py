@@ -0,0 +1,140 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from src.utils.timestamps import NAT, parse_iso_timestamps
+
+ASOF_DIRECTIONS = ('nearest', 'backward', 'forward')
+
+# Index untuk baris yang tidak punya pasangan
+NO_MATCH = -1
+
+
+def asof_match(left_keys, left_ts, right_keys, right_ts, tolerance_us: Optional[int] = None,
+               direction: str = 'nearest') -> np.ndarray:
+    """
+    Cari pasangan as-of untuk setiap baris kiri: baris kanan dengan key sama
+    dan timestamp terdekat
+
+    Kedua sisi di-factorize ke integer code, sisi kanan diurutkan berdasarkan
+    (code, timestamp), lalu posisi setiap baris kiri dicari dengan satu
+    np.searchsorted di atas composite key (code * n + rank timestamp). Tidak
+    ada loop Python per user maupun per baris; kompleksitas O(n log n).
+
+    Args:
+        left_keys, right_keys: Array key (mis. user_id)
+        left_ts, right_ts: Timestamp sebagai int64 epoch microseconds (NAT = kosong)
+        tolerance_us: Selisih maksimum dalam microseconds (None = tanpa batas)
+        direction: 'nearest', 'backward' (request sebelum/sama dengan activity)
+                   atau 'forward' (request sesudah/sama dengan activity)
+
+    Returns:
+        Array int64 sepanjang sisi kiri berisi index baris kanan, NO_MATCH jika tidak ada
+    """
+    if direction not in ASOF_DIRECTIONS:
+        raise ValueError(f"Unsupported as-of direction: {direction}. Use one of {ASOF_DIRECTIONS}")
+    left_ts = np.asarray(left_ts, dtype=np.int64)
+    right_ts = np.asarray(right_ts, dtype=np.int64)
+    n_left = len(left_ts)
+
+    codes, _ = pd.factorize(np.concatenate([np.asarray(left_keys, dtype=object),
+                                            np.asarray(right_keys, dtype=object)]))
+    left_codes, right_codes = codes[:n_left].astype(np.int64), codes[n_left:].astype(np.int64)
+
+    # Baris kanan tanpa key/timestamp tidak bisa dipasangkan
+    right_valid = np.flatnonzero((right_codes >= 0) & (right_ts != NAT))
+    order = right_valid[np.lexsort((right_ts[right_valid], right_codes[right_valid]))]
+    sorted_codes = right_codes[order]
+    sorted_ts = right_ts[order]
+
+    # Rank timestamp gabungan supaya composite key tidak overflow
+    all_ts, ranks = np.unique(np.concatenate([left_ts, sorted_ts]), return_inverse=True)
+    width = np.int64(len(all_ts) + 1)
+    left_composite = left_codes * width + ranks[:n_left]
+    right_composite = sorted_codes * width + ranks[n_left:]
+
+    # Batas grup key sama di sisi kanan, dan posisi pertama dengan timestamp >= timestamp kiri
+    group_start = np.searchsorted(sorted_codes, left_codes, side='left')
+    group_end = np.searchsorted(sorted_codes, left_codes, side='right')
+    position = np.searchsorted(right_composite, left_composite, side='left')
+
+    if len(order) == 0:
+        return np.full(n_left, NO_MATCH, dtype=np.int64)
+    has_prev = position > group_start
+    has_next = position < group_end
+    prev_idx = np.maximum(position - 1, 0)
+    next_idx = np.minimum(position, len(order) - 1)
+
+    prev_gap = np.where(has_prev, left_ts - sorted_ts[prev_idx], np.iinfo(np.int64).max)
+    next_gap = np.where(has_next, sorted_ts[next_idx] - left_ts, np.iinfo(np.int64).max)
+    if direction == 'backward':
+        # Timestamp sama persis dengan activity juga dihitung sebagai backward
+        exact = has_next & (next_gap == 0)
+        use_next = exact
+        gap = np.where(exact, 0, prev_gap)
+        found = has_prev | exact
+    elif direction == 'forward':
+        use_next = np.ones(n_left, dtype=bool)
+        gap = next_gap
+        found = has_next
+    else:
+        # Jika jaraknya sama, pilih request yang lebih awal
+        use_next = next_gap < prev_gap
+        gap = np.minimum(prev_gap, next_gap)
+        found = has_prev | has_next
+
+    match = np.where(use_next, order[next_idx], order[prev_idx])
+    found &= (left_codes >= 0) & (left_ts != NAT)
+    if tolerance_us is not None:
+        found &= gap <= tolerance_us
+    return np.where(found, match, NO_MATCH)
+
+
+def asof_join(left_df: pd.DataFrame, right_df: pd.DataFrame, key: str = 'user_id', on: str = 'timestamp',
+              tolerance=None, direction: str = 'nearest', how: str = 'inner',
+              suffixes: Tuple[str, str] = ('_x', '_y')) -> pd.DataFrame:
+    """
+    As-of join: setiap baris kiri dipasangkan dengan paling banyak satu baris
+    kanan (key sama, timestamp terdekat dalam toleransi)
+
+    Ukuran output linear terhadap input (<= len(left_df)), berbeda dengan join
+    biasa yang memasangkan setiap activity dengan semua request user tersebut.
+    Kolom output mengikuti pd.merge: kolom yang bentrok (termasuk `on`) diberi suffix.
+
+    Args:
+        left_df: DataFrame kiri (mis. user_activities)
+        right_df: DataFrame kanan (mis. api_logs)
+        key: Kolom key
+        on: Kolom timestamp (string ISO atau datetime64)
+        tolerance: Selisih maksimum, apa saja yang diterima pd.Timedelta (mis. '5s'); None = tanpa batas
+        direction: 'nearest', 'backward' atau 'forward'
+        how: 'inner' (hanya baris yang punya pasangan) atau 'left'
+        suffixes: Suffix untuk kolom yang bentrok
+
+    Returns:
+        DataFrame hasil join
+    """
+    if how not in ('inner', 'left'):
+        raise ValueError(f"Unsupported as-of join type: {how}. Use 'inner' or 'left'")
+    tolerance_us = None if tolerance is None else int(pd.Timedelta(tolerance) // pd.Timedelta(microseconds=1))
+    match = asof_match(left_df[key].to_numpy(), parse_iso_timestamps(left_df[on].to_numpy()),
+                       right_df[key].to_numpy(), parse_iso_timestamps(right_df[on].to_numpy()),
+                       tolerance_us=tolerance_us, direction=direction)
+    matched = match != NO_MATCH
+    logging.info(f"As-of join matched {int(matched.sum())} of {len(left_df)} rows "
+                 f"(tolerance={tolerance}, direction={direction})")
+
+    if how == 'inner':
+        left_part = left_df[matched].reset_index(drop=True)
+        right_part = right_df.iloc[match[matched]].reset_index(drop=True)
+    else:
+        left_part = left_df.reset_index(drop=True)
+        # reindex dengan -1 menghasilkan NaN untuk baris tanpa pasangan
+        right_part = right_df.reset_index(drop=True).reindex(match)
+        right_part.index = left_part.index
+
+    right_part = right_part.drop(columns=[key])
+    common = set(left_part.columns) & set(right_part.columns)
+    left_part = left_part.rename(columns={c: f"{c}{suffixes[0]}" for c in common})
+    right_part = right_part.rename(columns={c: f"{c}{suffixes[1]}" for c in common})
+    return pd.concat([left_part, right_part], axis=1)
@@ -0,0 +1,309 @@
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import re
+import shutil
+import tempfile
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.transformers.join import JOIN_TYPES, hash_join
+from src.transformers.spill_join import DEFAULT_MEMORY_BUDGET_MB
+
+# Perkiraan ukuran hash table (dict Python) dibanding ukuran JSON mentahnya
+HASH_TABLE_EXPANSION = 8
+
+MAX_PARTITIONS = 4096
+
+PARTITION_BUFFER_SIZE = 256 * 1024
+
+# Jumlah baris yang di-sample per file untuk mendeteksi hot key
+DEFAULT_SKEW_SAMPLE_SIZE = 10000
+
+
+def choose_partition_count(build_bytes: int, memory_budget_mb: float, workers: int = 1) -> int:
+    """
+    Jumlah partisi supaya hash table satu partisi muat di memory budget
+
+    Jika join dijalankan paralel, setiap worker memegang satu hash table
+    sehingga budget dibagi rata ke semua worker.
+    """
+    budget = memory_budget_mb * 1024 * 1024 / max(workers, 1)
+    count = math.ceil(build_bytes * HASH_TABLE_EXPANSION / max(budget, 1))
+    return min(max(count, 1), MAX_PARTITIONS)
+
+
+def _key_pattern(key: str) -> re.Pattern:
+    return re.compile(rb'"' + re.escape(key.encode('utf-8')) + rb'"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+
+def _normalize_raw_key(raw_key: Optional[bytes]) -> Optional[bytes]:
+    """Raw token key dalam bentuk kanonik (None untuk key kosong)"""
+    if raw_key is None or raw_key == b'null':
+        return None
+    if b'\\' in raw_key:
+        # Samakan bentuk escape yang berbeda untuk string yang sama; ensure_ascii=False supaya
+        # "\u00e9" di-encode sama dengan "é" yang ditulis apa adanya (UTF-8)
+        raw_key = json.dumps(json.loads(raw_key), ensure_ascii=False).encode('utf-8', 'surrogatepass')
+    return raw_key
+
+
+def partition_of(raw_key: Optional[bytes], num_partitions: int) -> int:
+    """
+    Partisi untuk raw value key (token JSON, mis. b'"USER_0001"')
+
+    Memakai crc32 supaya hasilnya sama di semua proses (hash() Python di-random
+    per proses). Record tanpa key masuk partisi 0.
+    """
+    raw_key = _normalize_raw_key(raw_key)
+    if raw_key is None:
+        return 0
+    return zlib.crc32(raw_key) % num_partitions
+
+
+def sample_raw_keys(path: str, key: str, sample_size: int = DEFAULT_SKEW_SAMPLE_SIZE,
+                    seed: int = 0) -> Tuple[Counter, float]:
+    """
+    Histogram raw key dari sample baris file JSONL
+
+    File kecil dibaca seluruhnya (histogram eksak). File besar di-sample di
+    offset acak lewat mmap: baris sesudah setiap offset diambil, sehingga
+    biaya sampling tidak bergantung pada ukuran file.
+
+    Returns:
+        (Counter raw key -> jumlah di sample, perkiraan jumlah baris file)
+    """
+    pattern = _key_pattern(key)
+    counts: Counter = Counter()
+    size = os.path.getsize(path)
+    if size == 0:
+        return counts, 0.0
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        head_end = mm.find(b'\n')
+        first_line = max(head_end + 1 if head_end != -1 else size, 1)
+        if size // first_line <= sample_size:
+            lines = [line for line in mm[:].splitlines() if line.strip()]
+            for line in lines:
+                match = pattern.search(line)
+                counts[_normalize_raw_key(match.group(1) if match else None)] += 1
+            counts.pop(None, None)
+            return counts, float(len(lines))
+
+        rng = random.Random(seed)
+        sampled, sampled_bytes = 0, 0
+        for offset in sorted(rng.randrange(size) for _ in range(sample_size)):
+            start = mm.find(b'\n', offset) + 1
+            if start <= 0 or start >= size:
+                continue
+            end = mm.find(b'\n', start)
+            line = mm[start:end if end != -1 else size]
+            match = pattern.search(line)
+            counts[_normalize_raw_key(match.group(1) if match else None)] += 1
+            sampled += 1
+            sampled_bytes += len(line) + 1
+    counts.pop(None, None)
+    return counts, size / (sampled_bytes / sampled) if sampled else 0.0
+
+
+def plan_hot_keys(left_path: str, right_path: str, key: str, num_partitions: int, how: str = 'inner',
+                  skew_factor: float = 1.0,
+                  sample_size: int = DEFAULT_SKEW_SAMPLE_SIZE) -> Dict[bytes, Tuple[int, str]]:
+    """
+    Deteksi hot key dan tentukan berapa partisi yang dipakai untuk masing-masing
+
+    Beban satu key di hash join kira-kira left[k] + right[k] + left[k] * right[k]
+    (build, probe dan output). Key yang bebannya lebih dari skew_factor kali
+    beban rata-rata satu partisi dianggap hot dan dipecah ke beberapa partisi:
+    baris sisi yang lebih berat disebar round-robin, baris sisi lain untuk key
+    itu direplikasi ke semua partisi tersebut. Setiap pasangan tetap muncul
+    tepat sekali.
+
+    Sisi yang direplikasi tidak boleh sisi yang dipertahankan oleh outer join
+    (baris tanpa pasangan akan muncul berkali-kali), sehingga left join selalu
+    memecah sisi kiri, right join sisi kanan, dan full outer join tidak dipecah.
+
+    Returns:
+        Dictionary raw key -> (jumlah partisi, sisi yang dipecah 'left'/'right')
+    """
+    if how == 'outer' or num_partitions <= 1:
+        return {}
+    left_counts, left_lines = sample_raw_keys(left_path, key, sample_size)
+    right_counts, right_lines = sample_raw_keys(right_path, key, sample_size)
+    left_scale = left_lines / max(sum(left_counts.values()), 1)
+    right_scale = right_lines / max(sum(right_counts.values()), 1)
+
+    costs = {}
+    for raw_key in left_counts.keys() | right_counts.keys():
+        left_rows = left_counts.get(raw_key, 0) * left_scale
+        right_rows = right_counts.get(raw_key, 0) * right_scale
+        costs[raw_key] = (left_rows, right_rows, left_rows + right_rows + left_rows * right_rows)
+
+    pairs = sum(left_rows * right_rows for left_rows, right_rows, _ in costs.values())
+    target = max((left_lines + right_lines + pairs) / num_partitions, 1.0)
+
+    hot_keys = {}
+    for raw_key, (left_rows, right_rows, cost) in costs.items():
+        if cost <= skew_factor * target:
+            continue
+        splits = min(math.ceil(cost / target), num_partitions)
+        if how == 'left' or how == 'right':
+            side = how
+        else:
+            side = 'left' if left_rows >= right_rows else 'right'
+        hot_keys[raw_key] = (splits, side)
+    for raw_key, (splits, side) in hot_keys.items():
+        logging.info(f"Hot key {raw_key.decode('utf-8', 'replace')}: {side} side split across {splits} partitions")
+    return hot_keys
+
+
+def partition_jsonl(path: str, key: str, num_partitions: int, out_dir: str, name: str,
+                    hot_keys: Optional[Dict[bytes, Tuple[int, bool]]] = None) -> List[str]:
+    """
+    Hash-partition file JSONL berdasarkan key tanpa decode JSON
+
+    Key diambil dari raw line dengan regex, lalu baris ditulis apa adanya ke
+    file partisi. Urutan baris dalam satu partisi sama dengan urutan di file asli.
+
+    Args:
+        hot_keys: Raw key -> (jumlah partisi, replicate). Baris hot key ditulis
+                  ke partisi partition_of(key) + 0..n-1: round-robin ke salah
+                  satunya, atau ke semuanya jika replicate
+
+    Returns:
+        List path file partisi (panjang num_partitions)
+    """
+    pattern = _key_pattern(key)
+    hot_keys = hot_keys or {}
+    hot_rows: Counter = Counter()
+    paths = [os.path.join(out_dir, f"{name}-{i}.jsonl") for i in range(num_partitions)]
+    files = [open(p, 'wb', buffering=PARTITION_BUFFER_SIZE) for p in paths]
+    try:
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if not line.endswith(b'\n'):
+                    line += b'\n'
+                match = pattern.search(line)
+                raw_key = match.group(1) if match else None
+                partition = partition_of(raw_key, num_partitions)
+                hot = hot_keys.get(_normalize_raw_key(raw_key)) if hot_keys and raw_key else None
+                if hot is None:
+                    files[partition].write(line)
+                    continue
+                splits, replicate = hot
+                if replicate:
+                    for i in range(splits):
+                        files[(partition + i) % num_partitions].write(line)
+                else:
+                    raw_key = _normalize_raw_key(raw_key)
+                    files[(partition + hot_rows[raw_key] % splits) % num_partitions].write(line)
+                    hot_rows[raw_key] += 1
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def _read_partition(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _join_partition(task: Tuple[str, str, str, str, Optional[Tuple[str, str]], str]) -> Tuple[str, int]:
+    """Join satu pasangan partisi di worker process, hasil ditulis sebagai JSONL"""
+    left_path, right_path, key, how, suffixes, output_path = task
+    left = list(_read_partition(left_path))
+    right = list(_read_partition(right_path))
+    rows = 0
+    with open(output_path, 'w', buffering=PARTITION_BUFFER_SIZE) as f:
+        for record in hash_join(left, right, key=key, how=how, suffixes=suffixes):
+            f.write(json.dumps(record))
+            f.write('\n')
+            rows += 1
+    return output_path, rows
+
+
+def grace_hash_join(left_path: str, right_path: str, key: str = 'user_id', how: str = 'inner',
+                    suffixes: Optional[Tuple[str, str]] = None,
+                    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                    num_partitions: Optional[int] = None, workers: int = 1,
+                    spill_dir: Optional[str] = None, skew_factor: Optional[float] = None,
+                    skew_sample_size: int = DEFAULT_SKEW_SAMPLE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Grace hash join dua file JSONL yang tidak muat di memory
+
+    Kedua file di-hash-partition berdasarkan key ke num_partitions file di
+    disk. Record dengan key sama pasti ada di partisi dengan nomor sama,
+    sehingga setiap pasangan partisi bisa di-join sendiri-sendiri dengan
+    hash_join (opsional paralel di worker process).
+
+    Dengan skew_factor, hot key (mis. user dengan request sangat banyak)
+    dideteksi dari sample kedua file dan dipecah ke beberapa partisi (lihat
+    plan_hot_keys), sehingga waktu join paralel tidak ditentukan oleh satu
+    partisi yang jauh lebih berat dari yang lain.
+
+    Args:
+        left_path: File JSONL sisi kiri
+        right_path: File JSONL sisi kanan
+        key: Nama field join
+        how: 'inner', 'left', 'right' atau 'outer'
+        suffixes: Suffix untuk field yang bentrok, mis. ('_x', '_y')
+        memory_budget_mb: Memory untuk hash table (dipakai jika num_partitions None)
+        num_partitions: Jumlah partisi (None = dihitung dari ukuran file dan budget)
+        workers: Jumlah worker process untuk join per partisi
+        spill_dir: Folder untuk file partisi (None = temp dir sistem)
+        skew_factor: Key dengan beban > skew_factor x rata-rata partisi dipecah
+                     (None = tanpa hot-key splitting)
+        skew_sample_size: Jumlah baris yang di-sample per file untuk deteksi hot key
+
+    Yields:
+        Record hasil merge, partisi demi partisi
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unsupported join type: {how}. Use one of {JOIN_TYPES}")
+    workers = max(workers or 1, 1)
+    if num_partitions is None:
+        build_bytes = min(os.path.getsize(left_path), os.path.getsize(right_path))
+        num_partitions = choose_partition_count(build_bytes, memory_budget_mb, workers)
+
+    hot_keys = {}
+    if skew_factor is not None:
+        # Minimal satu partisi per worker supaya ada tempat untuk menyebar hot key
+        num_partitions = max(num_partitions, workers)
+        hot_keys = plan_hot_keys(left_path, right_path, key, num_partitions, how=how,
+                                 skew_factor=skew_factor, sample_size=skew_sample_size)
+
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='grace-join-', dir=spill_dir)
+    try:
+        left_parts = partition_jsonl(left_path, key, num_partitions, work_dir, 'left',
+                                     {k: (splits, side != 'left') for k, (splits, side) in hot_keys.items()})
+        right_parts = partition_jsonl(right_path, key, num_partitions, work_dir, 'right',
+                                      {k: (splits, side != 'right') for k, (splits, side) in hot_keys.items()})
+        logging.info(f"Grace hash join: {num_partitions} partitions, workers={workers}, hot keys={len(hot_keys)}")
+
+        if workers <= 1:
+            for left_part, right_part in zip(left_parts, right_parts):
+                yield from hash_join(list(_read_partition(left_part)), list(_read_partition(right_part)),
+                                     key=key, how=how, suffixes=suffixes)
+                os.remove(left_part)
+                os.remove(right_part)
+            return
+
+        tasks = [(left_part, right_part, key, how, suffixes, os.path.join(work_dir, f"out-{i}.jsonl"))
+                 for i, (left_part, right_part) in enumerate(zip(left_parts, right_parts))]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() mempertahankan urutan partisi; hasil dibaca begitu partisinya selesai
+            for output_path, _ in executor.map(_join_partition, tasks):
+                yield from _read_partition(output_path)
+                os.remove(output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,104 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+JOIN_TYPES = ('inner', 'left', 'right', 'outer')
+
+
+def merge_records(left: Dict[str, Any], right: Dict[str, Any], key: str,
+                  suffixes: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+    """
+    Gabungkan satu record kiri dan kanan
+
+    Tanpa suffixes, field kanan menimpa field kiri (perilaku join_data).
+    Dengan suffixes (mis. ('_x', '_y') seperti pd.merge), field yang ada di
+    kedua sisi diberi suffix.
+    """
+    if not suffixes:
+        return {**left, **right}
+    common = (left.keys() & right.keys()) - {key}
+    if not common:
+        return {**left, **right}
+    left_suffix, right_suffix = suffixes
+    merged = {(f"{name}{left_suffix}" if name in common else name): value for name, value in left.items()}
+    for name, value in right.items():
+        if name in common:
+            merged[f"{name}{right_suffix}"] = value
+        elif name not in merged:
+            merged[name] = value
+    return merged
+
+
+def _choose_build_side(left: Iterable, right: Iterable) -> str:
+    """Build hash table di sisi yang lebih kecil (atau sisi yang ukurannya diketahui)"""
+    left_size = len(left) if hasattr(left, '__len__') else None
+    right_size = len(right) if hasattr(right, '__len__') else None
+    if left_size is not None and right_size is not None:
+        return 'left' if left_size < right_size else 'right'
+    if left_size is not None:
+        return 'left'
+    return 'right'
+
+
+def hash_join(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]], key: str = 'user_id',
+              how: str = 'inner', suffixes: Optional[Tuple[str, str]] = None,
+              build_side: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Hash join dua kumpulan record berdasarkan key
+
+    Hash table (multi-map key -> list of records) dibangun dari sisi yang lebih
+    kecil, lalu sisi lain di-stream sebagai probe. Semua pasangan yang cocok
+    dihasilkan (many-to-many), dan hasilnya di-yield satu per satu sehingga
+    output join tidak pernah perlu di-materialize.
+
+    Args:
+        left: Record sisi kiri (mis. user_activities)
+        right: Record sisi kanan (mis. api_logs)
+        key: Nama field join
+        how: 'inner', 'left', 'right' atau 'outer' (full outer)
+        suffixes: Suffix untuk field yang bentrok, mis. ('_x', '_y')
+        build_side: Paksa sisi build ('left'/'right'); default otomatis
+
+    Yields:
+        Record hasil merge (urutan field: kiri lalu kanan)
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unsupported join type: {how}. Use one of {JOIN_TYPES}")
+
+    build_side = build_side or _choose_build_side(left, right)
+    build, probe = (left, right) if build_side == 'left' else (right, left)
+    keep_build = how == 'outer' or how == build_side
+    keep_probe = how == 'outer' or (how != 'inner' and how != build_side)
+
+    # Multi-map: setiap key menyimpan semua record, bukan hanya yang terakhir
+    table: Dict[Any, List[Dict[str, Any]]] = {}
+    unkeyed: List[Dict[str, Any]] = []
+    for record in build:
+        value = record.get(key)
+        if value is None:
+            if keep_build:
+                unkeyed.append(record)
+            continue
+        table.setdefault(value, []).append(record)
+    logging.debug(f"Hash join built on {build_side} side: {len(table)} keys")
+
+    matched_keys = set()
+    for record in probe:
+        value = record.get(key)
+        bucket = table.get(value) if value is not None else None
+        if bucket:
+            if keep_build:
+                matched_keys.add(value)
+            for other in bucket:
+                if build_side == 'left':
+                    yield merge_records(other, record, key, suffixes)
+                else:
+                    yield merge_records(record, other, key, suffixes)
+        elif keep_probe:
+            yield record
+
+    # Record di sisi build yang tidak punya pasangan (left/right/outer join)
+    if keep_build:
+        for value, bucket in table.items():
+            if value not in matched_keys:
+                yield from bucket
+        yield from unkeyed
@@ -0,0 +1,131 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Tuple
+
+# Ringkasan api_logs per user yang dipakai saat pre-aggregation
+LOG_SUMMARY_COLUMNS = ['request_count', 'error_count', 'avg_response_time', 'max_response_time',
+                       'first_request_at', 'last_request_at']
+
+# Jumlah key terberat yang dicantumkan di estimasi
+TOP_KEYS = 10
+
+
+def key_histogram(keys) -> pd.Series:
+    """
+    Frekuensi setiap key (nilai kosong diabaikan karena tidak pernah cocok saat join)
+
+    Args:
+        keys: Array/Series berisi key join
+
+    Returns:
+        Series key -> jumlah baris
+    """
+    return pd.Series(keys).value_counts(sort=False, dropna=True)
+
+
+def estimate_join_size(left_keys, right_keys) -> Dict[str, Any]:
+    """
+    Estimasi ukuran output join dari histogram key kedua sisi
+
+    Untuk equi-join, jumlah baris inner join persis sum(left[k] * right[k])
+    untuk setiap key k yang ada di kedua sisi, sehingga "estimasi" ini eksak
+    dan murah (hanya dua value_counts) dibandingkan menjalankan join-nya.
+
+    Args:
+        left_keys: Key sisi kiri (mis. activities_df['user_id'])
+        right_keys: Key sisi kanan (mis. logs_df['user_id'])
+
+    Returns:
+        Dictionary berisi jumlah baris, jumlah key, output_rows (inner),
+        left_join_rows, fan-out dan key dengan kontribusi output terbesar
+    """
+    left_hist = key_histogram(left_keys)
+    right_hist = key_histogram(right_keys)
+    left_matched, right_matched = left_hist.align(right_hist, join='inner')
+    pair_counts = left_matched.astype(np.int64) * right_matched.astype(np.int64)
+
+    left_rows = int(len(left_keys))
+    output_rows = int(pair_counts.sum())
+    unmatched_left = left_rows - int(left_matched.sum())
+    top = pair_counts.sort_values(ascending=False).head(TOP_KEYS)
+    return {
+        'left_rows': left_rows,
+        'right_rows': int(len(right_keys)),
+        'left_keys': int(len(left_hist)),
+        'right_keys': int(len(right_hist)),
+        'matched_keys': int(len(pair_counts)),
+        'output_rows': output_rows,
+        'left_join_rows': output_rows + unmatched_left,
+        'fanout': output_rows / max(left_rows, 1),
+        'top_keys': {str(key): int(rows) for key, rows in top.items()},
+    }
+
+
+def pre_aggregate_logs(logs_df: pd.DataFrame, key: str = 'user_id') -> pd.DataFrame:
+    """
+    Ringkas api_logs menjadi satu baris per user sebelum join
+
+    Join activities dengan ringkasan ini bersifat many-to-one, sehingga output
+    join paling banyak sama dengan jumlah activities (tidak ada fan-out).
+
+    Args:
+        logs_df: DataFrame api_logs
+        key: Kolom join
+
+    Returns:
+        DataFrame dengan kolom key + LOG_SUMMARY_COLUMNS
+    """
+    grouped = logs_df.assign(is_error=logs_df['status_code'] >= 400).groupby(key, sort=False)
+    summary = grouped.agg(
+        request_count=('status_code', 'size'),
+        error_count=('is_error', 'sum'),
+        avg_response_time=('response_time', 'mean'),
+        max_response_time=('response_time', 'max'),
+        first_request_at=('timestamp', 'min'),
+        last_request_at=('timestamp', 'max'),
+    ).reset_index()
+    logging.info(f"Pre-aggregated {len(logs_df)} api logs into {len(summary)} per-{key} rows")
+    return summary
+
+
+def join_weights(left_keys, right_keys) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multiplicity setiap baris di hasil inner join
+
+    Baris kiri dengan key k muncul right[k] kali di hasil join, dan baris
+    kanan muncul left[k] kali. Agregasi per sumber dengan bobot ini sama
+    dengan agregasi di frame hasil join, tanpa perlu membangun join-nya.
+
+    Args:
+        left_keys: Key sisi kiri (mis. activities_df['user_id'])
+        right_keys: Key sisi kanan (mis. logs_df['user_id'])
+
+    Returns:
+        (bobot per baris kiri, bobot per baris kanan) sebagai int64; 0 = tidak ikut join
+    """
+    left_keys, right_keys = pd.Series(left_keys), pd.Series(right_keys)
+    left_weights = left_keys.map(key_histogram(right_keys)).fillna(0).to_numpy(dtype=np.int64)
+    right_weights = right_keys.map(key_histogram(left_keys)).fillna(0).to_numpy(dtype=np.int64)
+    return left_weights, right_weights
+
+
+def joined_order(left_keys, right_keys) -> np.ndarray:
+    """
+    Urutan baris kanan sesuai kemunculan pertamanya di hasil pd.merge(how='inner')
+
+    pd.merge mempertahankan urutan key kiri: baris kanan untuk key k muncul
+    pertama kali di posisi activity pertama dengan key k, berurutan sesuai
+    file. Mengurutkan baris kanan berdasarkan (posisi kiri pertama, posisi
+    kanan) memberi urutan kemunculan pertama nilai yang sama dengan di hasil
+    join, sehingga tie-break value_counts tetap identik.
+
+    Returns:
+        Index baris kanan yang punya pasangan, terurut
+    """
+    left_keys, right_keys = pd.Series(left_keys), pd.Series(right_keys)
+    first_left = pd.Series(np.arange(len(left_keys)), index=left_keys.to_numpy())
+    first_left = first_left[~first_left.index.duplicated()]
+    position = right_keys.map(first_left)
+    matched = np.flatnonzero(position.notna().to_numpy())
+    return matched[np.argsort(position.to_numpy()[matched], kind='stable')]
@@ -0,0 +1,187 @@
+import heapq
+import itertools
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.transformers.join import JOIN_TYPES, merge_records
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+# Perkiraan overhead per entry di buffer (tuple + sort key + object bytes) di luar ukuran pickle
+ENTRY_OVERHEAD_BYTES = 120
+
+# Maksimum run yang di-merge sekaligus (dibatasi jumlah file yang dibuka bersamaan)
+MAX_MERGE_FANIN = 128
+
+RUN_BUFFER_SIZE = 1024 * 1024
+
+_first = itemgetter(0)
+
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    """Record tanpa key diurutkan paling akhir dan tidak pernah dianggap cocok"""
+    return (value is None, '' if value is None else value)
+
+
+def _write_run(entries: List[Tuple[Any, bytes]], run_dir: str, name: str) -> str:
+    path = os.path.join(run_dir, f"{name}.run")
+    with open(path, 'wb', buffering=RUN_BUFFER_SIZE) as f:
+        for _, payload in entries:
+            f.write(payload)
+    return path
+
+
+def _read_run(path: str, key: str) -> Iterator[Tuple[Tuple[bool, Any], Dict[str, Any]]]:
+    with open(path, 'rb', buffering=RUN_BUFFER_SIZE) as f:
+        while True:
+            try:
+                record = pickle.load(f)
+            except EOFError:
+                return
+            yield _sort_key(record.get(key)), record
+
+
+def _merge_runs(runs: List[str], key: str) -> Iterator[Tuple[Tuple[bool, Any], Dict[str, Any]]]:
+    return heapq.merge(*(_read_run(path, key) for path in runs), key=_first)
+
+
+def external_sort(records: Iterable[Dict[str, Any]], key: str, memory_budget_bytes: int,
+                  run_dir: str, name: str = 'run') -> Iterator[Tuple[Tuple[bool, Any], Dict[str, Any]]]:
+    """
+    Urutkan record berdasarkan key dengan memory terbatas
+
+    Record di-buffer dalam bentuk pickle (lebih ringkas daripada dict). Setiap
+    kali buffer melewati memory_budget_bytes, buffer diurutkan dan ditulis ke
+    disk sebagai sorted run. Di akhir semua run di-merge secara streaming
+    (k-way merge). Jika data muat di memory, tidak ada yang ditulis ke disk.
+    Sort bersifat stable: record dengan key sama tetap dalam urutan input.
+
+    Args:
+        records: Iterable record (boleh generator)
+        key: Field untuk sort
+        memory_budget_bytes: Batas ukuran buffer di memory
+        run_dir: Folder untuk sorted run
+        name: Prefix nama file run
+
+    Yields:
+        Tuple (sort_key, record) terurut
+    """
+    buffer: List[Tuple[Any, bytes]] = []
+    buffered_bytes = 0
+    runs: List[str] = []
+    try:
+        for record in records:
+            payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+            buffer.append((_sort_key(record.get(key)), payload))
+            buffered_bytes += len(payload) + ENTRY_OVERHEAD_BYTES
+            if buffered_bytes >= memory_budget_bytes:
+                buffer.sort(key=_first)
+                runs.append(_write_run(buffer, run_dir, f"{name}-{len(runs)}"))
+                buffer, buffered_bytes = [], 0
+
+        buffer.sort(key=_first)
+        if not runs:
+            for sort_key, payload in buffer:
+                yield sort_key, pickle.loads(payload)
+            return
+
+        if buffer:
+            runs.append(_write_run(buffer, run_dir, f"{name}-{len(runs)}"))
+            buffer = []
+        logging.info(f"External sort {name}: spilled {len(runs)} sorted runs to {run_dir}")
+
+        # Multi-pass merge jika run terlalu banyak untuk dibuka sekaligus
+        level = 0
+        while len(runs) > MAX_MERGE_FANIN:
+            merged = []
+            for i in range(0, len(runs), MAX_MERGE_FANIN):
+                group = runs[i:i + MAX_MERGE_FANIN]
+                path = os.path.join(run_dir, f"{name}-merge{level}-{len(merged)}.run")
+                with open(path, 'wb', buffering=RUN_BUFFER_SIZE) as f:
+                    for _, record in _merge_runs(group, key):
+                        pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+                for old in group:
+                    os.remove(old)
+                merged.append(path)
+            runs, level = merged, level + 1
+
+        yield from _merge_runs(runs, key)
+    finally:
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def sort_merge_join(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]], key: str = 'user_id',
+                    how: str = 'inner', suffixes: Optional[Tuple[str, str]] = None,
+                    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                    spill_dir: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    External sort-merge join untuk input yang lebih besar dari RAM
+
+    Kedua sisi diurutkan berdasarkan key dengan external_sort (memory budget
+    dibagi dua), lalu di-merge secara streaming. Yang perlu ada di memory saat
+    merge hanya record sisi kanan untuk satu key. Output terurut berdasarkan key;
+    dalam satu key urutannya sama dengan pd.merge (kiri dulu, lalu pasangan kanan).
+
+    Args:
+        left: Record sisi kiri
+        right: Record sisi kanan
+        key: Nama field join
+        how: 'inner', 'left', 'right' atau 'outer'
+        suffixes: Suffix untuk field yang bentrok, mis. ('_x', '_y')
+        memory_budget_mb: Total memory untuk buffer sort kedua sisi
+        spill_dir: Folder untuk sorted run (None = temp dir sistem)
+
+    Yields:
+        Record hasil merge
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unsupported join type: {how}. Use one of {JOIN_TYPES}")
+    keep_left = how in ('left', 'outer')
+    keep_right = how in ('right', 'outer')
+
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix='sort-merge-', dir=spill_dir)
+    side_budget = int(memory_budget_mb * 1024 * 1024) // 2
+    left_sorted = external_sort(left, key, side_budget, run_dir, 'left')
+    right_sorted = external_sort(right, key, side_budget, run_dir, 'right')
+    try:
+        left_groups = itertools.groupby(left_sorted, key=_first)
+        right_groups = itertools.groupby(right_sorted, key=_first)
+        left_group = next(left_groups, None)
+        right_group = next(right_groups, None)
+
+        while left_group is not None and right_group is not None:
+            left_key, left_rows = left_group
+            right_key, right_rows = right_group
+            if left_key == right_key and not left_key[0]:
+                matches = [record for _, record in right_rows]
+                for _, record in left_rows:
+                    for other in matches:
+                        yield merge_records(record, other, key, suffixes)
+                left_group, right_group = next(left_groups, None), next(right_groups, None)
+            elif left_key <= right_key:
+                if keep_left:
+                    yield from (record for _, record in left_rows)
+                left_group = next(left_groups, None)
+            else:
+                if keep_right:
+                    yield from (record for _, record in right_rows)
+                right_group = next(right_groups, None)
+
+        while keep_left and left_group is not None:
+            yield from (record for _, record in left_group[1])
+            left_group = next(left_groups, None)
+        while keep_right and right_group is not None:
+            yield from (record for _, record in right_group[1])
+            right_group = next(right_groups, None)
+    finally:
+        left_sorted.close()
+        right_sorted.close()
+        shutil.rmtree(run_dir, ignore_errors=True)
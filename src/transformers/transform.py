@@ -1,34 +1,196 @@
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import pickle
 import random
 import string
-from typing import List, Dict, Callable
+import time
+import numpy as np
+from typing import List, Dict, Callable, Optional, Tuple
+from src.extractors.columnar import ColumnarBatch
+from src.transformers.join import hash_join
+from src.utils.timestamps import epoch_us_to_datetime64
+
+
+def batch_transform(func: Callable) -> Callable:
+    """Tandai fungsi sebagai batch transform: menerima dan mengembalikan ColumnarBatch"""
+    func.is_batch_transform = True
+    return func
+
+
+def is_batch_transform(func: Callable) -> bool:
+    return getattr(func, 'is_batch_transform', False)
+
+
+class RecordTransformAdapter:
+    """Jalankan transform per-dict di atas ColumnarBatch (batch -> records -> batch)"""
+
+    is_batch_transform = True
+
+    def __init__(self, func: Callable[[Dict], Dict]):
+        self.func = func
+        self.__name__ = getattr(func, '__name__', type(func).__name__)
+
+    def __call__(self, batch: ColumnarBatch) -> ColumnarBatch:
+        # Schema, dictionary dan timestamp yang sudah di-parse dari batch input tetap dipakai
+        return ColumnarBatch.from_records_like([self.func(record) for record in batch.to_records()], batch)
+
+
+def as_batch_transform(func: Callable) -> Callable:
+    return func if is_batch_transform(func) else RecordTransformAdapter(func)
+
+
+class FusedRecordTransform:
+    """
+    Chain transform per-dict sebagai satu fungsi
+
+    Dengan begitu chain N transform cukup satu kali traversal data, tanpa
+    list perantara di setiap transform. Bisa di-pickle (jika semua transform-nya
+    bisa) sehingga dikirim utuh ke worker process.
+    """
+
+    def __init__(self, funcs: List[Callable[[Dict], Dict]]):
+        self.funcs = tuple(funcs)
+        self.__name__ = '+'.join(getattr(func, '__name__', type(func).__name__) for func in self.funcs)
+
+    def __call__(self, record: Dict) -> Dict:
+        for func in self.funcs:
+            record = func(record)
+        return record
+
+
+def fuse_record_transforms(funcs: List[Callable[[Dict], Dict]]) -> Callable[[Dict], Dict]:
+    """Gabungkan beberapa transform per-dict menjadi satu fungsi (lihat FusedRecordTransform)"""
+    return funcs[0] if len(funcs) == 1 else FusedRecordTransform(funcs)
+
+
+def _apply_record_chunk(args: Tuple[Callable[[Dict], Dict], List[Dict]]) -> List[Dict]:
+    """Worker: jalankan stage per-dict (biasanya FusedRecordTransform) di satu chunk"""
+    stage, chunk = args
+    return [stage(item) for item in chunk]
+
+
+def _is_picklable(funcs) -> bool:
+    try:
+        pickle.dumps(funcs)
+        return True
+    except Exception:
+        return False
+
+
+def _is_join(func: Callable) -> bool:
+    return getattr(func, '__name__', None) == 'join_data'
+
+
+# Default ukuran chunk yang dikirim ke setiap worker process
+DEFAULT_CHUNK_SIZE = 10000
 
 class Transform:
-    def __init__(self, transforms: List[Callable]):
+    def __init__(self, transforms: List[Callable], workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 schema: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            transforms: List fungsi transformasi (per-dict atau batch transform)
+            workers: Jumlah worker process untuk transform per-dict (1 = serial)
+            chunk_size: Jumlah record per chunk yang dikirim ke worker
+            schema: Tipe kolom (lihat COLUMN_SCHEMAS) saat list of dicts diubah ke ColumnarBatch
+                    untuk batch transform; None = semua kolom object
+        """
         self.transforms = transforms
+        self.schema = schema
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stage_transforms: Tuple[Callable, ...] = ()
+        self._stage_cache: List[Callable] = []
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """Matikan process pool jika ada"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _map_records(self, stage: Callable, data: List[Dict]) -> List[Dict]:
+        """
+        Jalankan stage per-dict ke seluruh data, paralel per chunk jika workers > 1
+
+        Urutan output selalu sama dengan urutan input. Transform yang tidak bisa
+        di-pickle (lambda, fungsi lokal) dijalankan serial.
+        """
+        if self.workers <= 1 or len(data) <= self.chunk_size:
+            return [stage(item) for item in data]
+        if not _is_picklable(stage):
+            logging.warning(f"Transform {stage.__name__} cannot be pickled, running serially")
+            return [stage(item) for item in data]
+
+        start = time.perf_counter()
+        chunks = [(stage, data[i:i + self.chunk_size]) for i in range(0, len(data), self.chunk_size)]
+        result = []
+        for chunk in self._get_executor().map(_apply_record_chunk, chunks):
+            result.extend(chunk)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Transform {stage.__name__}: {len(data)} records in {elapsed:.2f}s "
+                     f"({len(data) / elapsed:,.0f} records/sec, workers={self.workers})")
+        return result
+
+    def _stages(self) -> List[Callable]:
+        """
+        Susun transform menjadi stage; transform per-dict yang berurutan di-fuse
+
+        Stage disimpan dan hanya disusun ulang jika self.transforms berubah
+        (mis. DataPipeline.add_transform setelah batch pertama).
+        """
+        if self._stage_transforms != tuple(self.transforms):
+            self._stage_transforms = tuple(self.transforms)
+            self._stage_cache = self._build_stages()
+        return self._stage_cache
+
+    def _build_stages(self) -> List[Callable]:
+        stages, pending = [], []
+        for transform in self.transforms:
+            if is_batch_transform(transform) or _is_join(transform):
+                if pending:
+                    stages.append(fuse_record_transforms(pending))
+                    pending = []
+                stages.append(transform)
+            else:
+                pending.append(transform)
+        if pending:
+            stages.append(fuse_record_transforms(pending))
+        return stages
     
     def apply_transforms(self, data):
+        # ColumnarBatch: batch transform dipanggil langsung, transform per-dict lewat adapter
+        if isinstance(data, ColumnarBatch):
+            for transform in self._stages():
+                data = as_batch_transform(transform)(data)
+            logging.debug(f"Transformed columnar batch of {len(data)} rows")
+            return data
         # Jika data adalah list, terapkan transformasi ke setiap item
-        if isinstance(data, list):
-            print(f"Data before transform (list): {data}")
-            for transform in self.transforms:
+        elif isinstance(data, list):
+            for transform in self._stages():
                 # Untuk fungsi join, biasanya menerima dua list, jadi skip jika bukan dict
-                if hasattr(transform, '__name__') and transform.__name__ == 'join_data':
+                if _is_join(transform):
                     # join_data harus dipanggil secara eksplisit di pipeline
                     data = transform(*data) if isinstance(data, tuple) else transform(data)
+                elif is_batch_transform(transform):
+                    data = transform(ColumnarBatch.from_records(data, schema=self.schema)).to_records()
                 else:
-                    data = [transform(item) for item in data]
-            print(f"Data after transform (list): {data}")
+                    data = self._map_records(transform, data)
+            logging.debug(f"Transformed {len(data)} records")
             return data
         # Jika data adalah dict, proses seperti sebelumnya
         elif isinstance(data, dict):
-            print(f"Data before transform (dict): {data}")
             for transform in self.transforms:
                 data = transform(data)
-            print(f"Data after transform (dict): {data}")
             return data
         else:
-            print(f"Data before transform is not a dict or list: {type(data)}")
+            logging.warning(f"Data before transform is not a dict, list or ColumnarBatch: {type(data)}")
             return data
 
 
@@ -60,21 +222,46 @@ def add_response_category(data: Dict) -> Dict:
             data['response_category'] = 'Server Error'
     return data
 
+# Versi vectorized (ColumnarBatch) dari transformasi di atas
+
+@batch_transform
+def parse_timestamp_batch(batch: ColumnarBatch) -> ColumnarBatch:
+    if 'timestamp' in batch.columns:
+        # epoch_us() memakai hasil parsing yang sudah tersimpan di batch jika ada
+        epoch = batch.epoch_us('timestamp')
+        batch.set_column('timestamp', epoch_us_to_datetime64(epoch))
+        batch.epoch_columns['timestamp'] = epoch
+    return batch
+
+ANONYMIZED_ID_ALPHABET = np.frombuffer((string.ascii_uppercase + string.digits).encode('ascii'), dtype=np.uint8)
+
+@batch_transform
+def anonymize_user_id_batch(batch: ColumnarBatch) -> ColumnarBatch:
+    if 'user_id' in batch.columns:
+        # Generate semua ID acak sekaligus sebagai matrix byte (n x 10)
+        picks = np.random.randint(0, len(ANONYMIZED_ID_ALPHABET), size=(len(batch), 10))
+        ids = ANONYMIZED_ID_ALPHABET[picks].view('S10').ravel()
+        batch.set_column('user_id', ids.astype('U10'))
+    return batch
+
+RESPONSE_CATEGORIES = ['Success', 'Client Error', 'Server Error']
+
+@batch_transform
+def add_response_category_batch(batch: ColumnarBatch) -> ColumnarBatch:
+    if 'status_code' in batch.columns:
+        status = np.asarray(batch.decode('status_code'), dtype=np.int64)
+        codes = np.select([(status >= 200) & (status < 300), (status >= 400) & (status < 500)],
+                          [0, 1], default=2).astype(np.int8)
+        batch.set_column('response_category', codes, dictionary=list(RESPONSE_CATEGORIES))
+    return batch
+
 # Fungsi transformasi: join data user_activities dan api_logs berdasarkan user_id
 
 def join_data(user_activities: list, api_logs: list) -> list:
     """
     Melakukan join (merge) dua list of dict berdasarkan key 'user_id'.
     Hasilnya adalah list of dict, setiap dict merupakan hasil merge dari kedua sumber data.
-    Jika user_id tidak ditemukan di salah satu sumber, hanya data yang ada yang di-merge (inner join).
+    Semua pasangan yang cocok disimpan (many-to-many, inner join); lihat hash_join
+    untuk left/outer join dan output berupa generator.
     """
-    # Buat dict lookup untuk api_logs berdasarkan user_id
-    api_logs_dict = {item['user_id']: item for item in api_logs if 'user_id' in item}
-    
-    merged = []
-    for activity in user_activities:
-        user_id = activity.get('user_id')
-        if user_id in api_logs_dict:
-            merged_item = {**activity, **api_logs_dict[user_id]}
-            merged.append(merged_item)
-    return merged
+    return list(hash_join(user_activities, api_logs, key='user_id', how='inner'))
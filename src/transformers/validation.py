@@ -2,6 +2,7 @@ import pandas as pd
 import json
 from typing import Dict, List, Any
 from datetime import datetime
+from src.utils.timestamps import NAT, parse_iso_timestamps
 
 class DataValidator:
     def __init__(self, schema_path: str | None = None):
@@ -95,11 +96,12 @@ class DataValidator:
                         if not pd.api.types.is_float_dtype(data[field]):
                             validation_result["warnings"].append(f"Field {field} should be float type")
                     elif expected_type == "datetime":
-                        try:
-                            pd.to_datetime(data[field])
-                        except:
-                            validation_result["errors"].append(f"Field {field} should be datetime format")
-                            validation_result["passed"] = False
+                        # Kolom yang sudah di-parse saat extraction tidak perlu di-parse ulang
+                        if not pd.api.types.is_datetime64_any_dtype(data[field]):
+                            parsed = parse_iso_timestamps(data[field].to_numpy(dtype=object))
+                            if ((parsed == NAT) & data[field].notnull().to_numpy()).any():
+                                validation_result["errors"].append(f"Field {field} should be datetime format")
+                                validation_result["passed"] = False
                 except Exception as e:
                     validation_result["warnings"].append(f"Error checking data type for field {field}: {str(e)}")
         
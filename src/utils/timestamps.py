@@ -0,0 +1,43 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Sentinel untuk timestamp kosong/invalid (sama dengan representasi NaT di pandas)
+NAT = np.iinfo(np.int64).min
+
+
+def parse_iso_timestamps(values) -> np.ndarray:
+    """
+    Parse kolom timestamp ISO (mis. 2025-06-07T15:57:20.001323) ke int64 epoch microseconds
+
+    Seluruh kolom di-cast sekaligus dengan parser ISO 8601 bawaan numpy (C),
+    tanpa strptime per record. Jika ada nilai yang tidak bisa di-parse
+    (timezone offset, tanggal invalid, dll), kolom di-parse ulang dengan
+    pd.to_datetime dan nilai yang tetap gagal menjadi NAT.
+
+    Args:
+        values: Array/list string timestamp
+
+    Returns:
+        np.ndarray int64 berisi epoch microseconds (timezone-naive, dianggap UTC)
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[us]').view(np.int64)
+
+    try:
+        with warnings.catch_warnings():
+            # Timezone di string hanya didukung lewat warning, perlakukan sebagai gagal
+            warnings.simplefilter('error')
+            return values.astype('datetime64[us]').view(np.int64)
+    except (ValueError, TypeError, UserWarning, DeprecationWarning):
+        pass
+
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', utc=True, format='ISO8601')
+    parsed = parsed.dt.tz_localize(None).astype('datetime64[us]')
+    return np.where(parsed.isnull(), NAT, parsed.to_numpy().view(np.int64))
+
+
+def epoch_us_to_datetime64(epoch_us: np.ndarray) -> np.ndarray:
+    """View int64 epoch microseconds sebagai datetime64[us] (NAT menjadi NaT)"""
+    return np.asarray(epoch_us, dtype=np.int64).view('datetime64[us]')